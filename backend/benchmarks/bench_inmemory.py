@@ -0,0 +1,279 @@
+"""
+Microbenchmarks for the in-memory database layer.
+
+Populates InMemoryCollection (dict per document) and ColumnarCollection with
+synthetic chat traffic at several sizes and measures each collection
+operation at that size:
+
+    insert      insert_one of a new message
+    find_one    find_one by message id
+    find        find by session_id + to_list
+    find_sort   find by session_id + sort("timestamp") + to_list
+    delete      delete_many of one session (re-inserted untimed afterwards)
+
+Traffic is skewed like real chat: many sessions, with message counts per
+session drawn from a Pareto distribution, and reads picking sessions in
+proportion to their size (hot sessions are read more). Every workload runs
+until --seconds elapse or --max-ops operations complete, whichever is first,
+and reports ops/s with p50/p95/p99 latency. Peak memory is the tracemalloc
+peak while populating.
+
+Results can be saved as a JSON baseline and diffed against a later run:
+
+    python benchmarks/bench_inmemory.py --save before
+    ... change code ...
+    python benchmarks/bench_inmemory.py --compare benchmarks/baselines/before.json
+
+Usage (from the backend directory):
+    python benchmarks/bench_inmemory.py [--sizes 10000,100000,1000000]
+        [--layouts dict,columnar] [--seconds 1.0] [--max-ops 5000]
+        [--save NAME] [--compare PATH] [--threshold 10]
+"""
+import argparse
+import asyncio
+import gc
+import itertools
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from in_memory_db import CHAT_MESSAGE_SCHEMA, ColumnarCollection, InMemoryCollection  # noqa: E402
+
+BASELINE_DIR = Path(__file__).resolve().parent / "baselines"
+WORKLOADS = ("insert", "find_one", "find", "find_sort", "delete")
+LAYOUTS = {
+    "dict": lambda: InMemoryCollection("chat_messages"),
+    "columnar": lambda: ColumnarCollection("chat_messages", CHAT_MESSAGE_SCHEMA),
+}
+# ops/s and latency move in opposite directions when things get worse
+HIGHER_IS_BETTER = {"ops_per_sec": True, "p50_us": False, "p95_us": False, "p99_us": False, "peak_mib": False}
+
+SAMPLE_MESSAGES = [
+    "What are your catering prices?",
+    "Do you deliver to Coral Gables?",
+    "Our catering starts at $15 per person for basic packages.",
+    "How many guests are you expecting?",
+    "Can we book for December 20th?",
+]
+
+
+class Traffic:
+    """Deterministic synthetic chat traffic with skewed session sizes"""
+
+    def __init__(self, size: int, seed: int = 42):
+        self.rng = random.Random(seed)
+        self.start = datetime(2025, 1, 1)
+        self.clock = 0
+        # Pareto(1.2) session sizes: most sessions are short, a few are huge
+        sizes = []
+        while sum(sizes) < size:
+            sizes.append(max(1, int(self.rng.paretovariate(1.2) * 2)))
+        sizes[-1] -= sum(sizes) - size
+        self.sessions = [str(uuid.uuid4()) for _ in sizes]
+        self.weights = sizes
+        self.cum_weights = list(itertools.accumulate(sizes))
+        self.ids = []
+
+    def message(self, session_id: str):
+        self.clock += 1
+        return {
+            "id": str(uuid.uuid4()),
+            "session_id": session_id,
+            "message": SAMPLE_MESSAGES[self.clock % len(SAMPLE_MESSAGES)],
+            "sender": "user" if self.clock % 2 else "bot",
+            "timestamp": self.start + timedelta(milliseconds=self.clock),
+        }
+
+    def initial(self):
+        order = [s for s, n in zip(self.sessions, self.weights) for _ in range(n)]
+        self.rng.shuffle(order)
+        for session_id in order:
+            doc = self.message(session_id)
+            self.ids.append(doc["id"])
+            yield doc
+
+    def hot_session(self) -> str:
+        return self.rng.choices(self.sessions, cum_weights=self.cum_weights)[0]
+
+
+def percentile(sorted_values, fraction: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+async def timed(operation, seconds: float, max_ops: int, setup=None, cleanup=None):
+    """Run operation() repeatedly within the budget; returns the latency of each call
+
+    setup() runs untimed before each call and its result is passed to both
+    operation and cleanup (which also runs untimed).
+    """
+    latencies = []
+    deadline = time.perf_counter() + seconds
+    while len(latencies) < max_ops and (time.perf_counter() < deadline or len(latencies) < 3):
+        prepared = await setup() if setup is not None else None
+        started = time.perf_counter()
+        await (operation(prepared) if setup is not None else operation())
+        latencies.append(time.perf_counter() - started)
+        if cleanup is not None:
+            await cleanup(prepared)
+    return latencies
+
+
+def summarize(latencies):
+    latencies = sorted(latencies)
+    total = sum(latencies)
+    return {
+        "ops": len(latencies),
+        "ops_per_sec": len(latencies) / total if total else 0.0,
+        "p50_us": percentile(latencies, 0.50) * 1e6,
+        "p95_us": percentile(latencies, 0.95) * 1e6,
+        "p99_us": percentile(latencies, 0.99) * 1e6,
+    }
+
+
+async def run_layout(layout: str, size: int, args):
+    traffic = Traffic(size)
+    collection = LAYOUTS[layout]()
+
+    gc.collect()
+    tracemalloc.start()
+    for doc in traffic.initial():
+        await collection.insert_one(doc)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    async def insert():
+        await collection.insert_one(traffic.message(traffic.hot_session()))
+
+    async def find_one():
+        return await collection.find_one({"id": traffic.rng.choice(traffic.ids)})
+
+    async def find():
+        return await collection.find({"session_id": traffic.hot_session()}).to_list(1000)
+
+    async def find_sort():
+        return await collection.find({"session_id": traffic.hot_session()}).sort("timestamp", 1).to_list(1000)
+
+    # delete_many is timed alone; the session's documents are fetched before
+    # and re-inserted after so the collection keeps its size
+    async def pick_session():
+        session_id = traffic.hot_session()
+        return session_id, await collection.find({"session_id": session_id}).to_list(10**7)
+
+    async def delete(prepared):
+        await collection.delete_many({"session_id": prepared[0]})
+
+    async def restore(prepared):
+        for doc in prepared[1]:
+            await collection.insert_one(doc)
+
+    workloads = {
+        "insert": (insert, {}),
+        "find_one": (find_one, {}),
+        "find": (find, {}),
+        "find_sort": (find_sort, {}),
+        "delete": (delete, {"setup": pick_session, "cleanup": restore}),
+    }
+    results = {}
+    for name, (operation, hooks) in workloads.items():
+        if name in args.workloads:
+            results[name] = summarize(await timed(operation, args.seconds, args.max_ops, **hooks))
+
+    for stats in results.values():
+        stats["peak_mib"] = peak / 2**20
+    return results
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def print_table(report):
+    print(f"\n{'layout':<9} {'size':>9} {'workload':<10} {'ops/s':>12} {'p50 us':>10} {'p95 us':>10} {'p99 us':>10} {'peak MiB':>9}")
+    for key, stats in report["results"].items():
+        layout, size, workload = key.split("/")
+        print(
+            f"{layout:<9} {int(size):>9,} {workload:<10} {stats['ops_per_sec']:>12,.0f} "
+            f"{stats['p50_us']:>10.1f} {stats['p95_us']:>10.1f} {stats['p99_us']:>10.1f} {stats['peak_mib']:>9.1f}"
+        )
+
+
+def compare(report, baseline_path: Path, threshold: float) -> int:
+    """Print the change of every metric against a baseline; returns the regression count"""
+    baseline = json.loads(baseline_path.read_text())
+    print(f"\nCompared with {baseline_path.name} ({baseline['meta'].get('revision') or 'unknown revision'}), "
+          f"regressions beyond {threshold:.0f}% marked !")
+    regressions = 0
+    for key, stats in report["results"].items():
+        before = baseline["results"].get(key)
+        if before is None:
+            continue
+        changes = []
+        for metric, higher_is_better in HIGHER_IS_BETTER.items():
+            old, new = before.get(metric), stats.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old * 100
+            worse = -change if higher_is_better else change
+            flag = "!" if worse > threshold else " "
+            regressions += flag == "!"
+            changes.append(f"{metric} {change:+6.1f}%{flag}")
+        print(f"  {key:<28} " + "  ".join(changes))
+    return regressions
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=lambda v: [int(s) for s in v.split(",")], default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--layouts", type=lambda v: v.split(","), default=list(LAYOUTS))
+    parser.add_argument("--workloads", type=lambda v: v.split(","), default=list(WORKLOADS))
+    parser.add_argument("--seconds", type=float, default=1.0, help="time budget per workload")
+    parser.add_argument("--max-ops", type=int, default=5000, help="operation cap per workload")
+    parser.add_argument("--save", metavar="NAME", help=f"write the results to {BASELINE_DIR.name}/NAME.json")
+    parser.add_argument("--compare", metavar="PATH", type=Path, help="baseline JSON to diff against")
+    parser.add_argument("--threshold", type=float, default=10.0, help="percent change counted as a regression")
+    args = parser.parse_args()
+
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "date": datetime.utcnow().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seconds": args.seconds,
+            "max_ops": args.max_ops,
+        },
+        "results": {},
+    }
+    for size in args.sizes:
+        for layout in args.layouts:
+            print(f"{layout} @ {size:,} documents ...", flush=True)
+            for workload, stats in (await run_layout(layout, size, args)).items():
+                report["results"][f"{layout}/{size}/{workload}"] = stats
+
+    print_table(report)
+    if args.save:
+        BASELINE_DIR.mkdir(exist_ok=True)
+        path = BASELINE_DIR / f"{args.save}.json"
+        path.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"\nSaved baseline {path}")
+    if args.compare:
+        if compare(report, args.compare, args.threshold):
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,86 @@
+"""
+Memory benchmark for the in-memory chat_messages storage layouts.
+
+Inserts N synthetic chat messages (default 1,000,000) spread over a pool of
+sessions and reports the bytes per message held by the plain dict-per-document
+InMemoryCollection versus the compact ColumnarCollection, plus the time to
+insert and to read back one session's history.
+
+Usage (from the backend directory):
+    python benchmarks/bench_memory.py [--messages 1000000] [--sessions 20000]
+"""
+import argparse
+import asyncio
+import gc
+import random
+import sys
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from in_memory_db import CHAT_MESSAGE_SCHEMA, ColumnarCollection, InMemoryCollection  # noqa: E402
+
+SAMPLE_MESSAGES = [
+    "What are your catering prices?",
+    "Do you deliver to Coral Gables?",
+    "Our catering starts at $15 per person for basic packages.",
+    "How many guests are you expecting?",
+    "Can we book for December 20th?",
+]
+
+
+def generate_messages(count: int, sessions: int):
+    session_ids = [str(uuid.uuid4()) for _ in range(sessions)]
+    start = datetime(2025, 1, 1)
+    rng = random.Random(42)
+    for i in range(count):
+        yield {
+            "id": str(uuid.uuid4()),
+            "session_id": session_ids[rng.randrange(sessions)],
+            "message": SAMPLE_MESSAGES[i % len(SAMPLE_MESSAGES)],
+            "sender": "user" if i % 2 == 0 else "bot",
+            "timestamp": start + timedelta(milliseconds=i),
+        }
+
+
+async def measure(label: str, collection, count: int, sessions: int):
+    messages = generate_messages(count, sessions)
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    for doc in messages:
+        await collection.insert_one(doc)
+    insert_seconds = time.perf_counter() - started
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    probe = await collection.find_one({})
+    started = time.perf_counter()
+    history = await collection.find({"session_id": probe["session_id"]}).sort("timestamp", 1).to_list(1000)
+    read_ms = (time.perf_counter() - started) * 1000
+
+    # Shared message texts are interned by the generator, so the figure is
+    # the per-message overhead of the layout itself.
+    print(
+        f"{label:<12} {current / 2**20:>9.1f} MiB {current / count:>8.1f} B/msg "
+        f"{count / insert_seconds:>11,.0f} inserts/s {read_ms:>8.2f} ms/history ({len(history)} msgs)"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=1_000_000)
+    parser.add_argument("--sessions", type=int, default=20_000)
+    args = parser.parse_args()
+
+    print(f"{args.messages:,} messages across {args.sessions:,} sessions\n")
+    await measure("dict", InMemoryCollection("chat_messages"), args.messages, args.sessions)
+    await measure("columnar", ColumnarCollection("chat_messages", CHAT_MESSAGE_SCHEMA), args.messages, args.sessions)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,157 @@
+"""
+Throughput benchmark for the MongoDB connection settings.
+
+Runs the same chat workload against MONGO_URL under each setting and prints
+operations per second and p50/p99 latency, so the MONGO_* values can be
+picked from numbers rather than guesses:
+
+    pool         maxPoolSize values, with a mixed insert + history read load
+    write        chat_messages inserts under each write concern
+    read         history reads under each read preference
+
+Everything runs in a scratch database (bench_<random>) that is dropped at the
+end. Read preferences only differ on a replica set; against a standalone
+server every read goes to the primary.
+
+Usage (from the backend directory):
+    MONGO_URL=mongodb://localhost:27017 python benchmarks/bench_mongo.py \\
+        [--only pool,write,read] [--concurrency 64] [--operations 5000] \\
+        [--pool-sizes 10,50,100] [--write-concerns "0,1,majority,majority;j=true"] \\
+        [--read-preferences primary,secondaryPreferred,nearest]
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from motor.motor_asyncio import AsyncIOMotorClient  # noqa: E402
+
+from mongo_db import client_options, parse_write_concern, read_preference  # noqa: E402
+
+SESSIONS = 500
+
+
+def message(session_id: str):
+    return {
+        "id": str(uuid.uuid4()),
+        "session_id": session_id,
+        "message": "Do you cater for 50 guests?",
+        "sender": "user",
+        "timestamp": datetime.utcnow(),
+    }
+
+
+async def drive(label: str, operation, concurrency: int, operations: int):
+    """Run `operations` calls of operation() from `concurrency` tasks and report"""
+    latencies = []
+    remaining = operations
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            await operation()
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    p50 = statistics.median(latencies) * 1000
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+    print(f"  {label:<28} {len(latencies) / elapsed:>10,.0f} ops/s {p50:>8.2f} ms p50 {p99:>8.2f} ms p99")
+
+
+async def seed(collection, session_ids):
+    await collection.create_index([("session_id", 1), ("timestamp", 1)])
+    docs = [message(session_id) for session_id in session_ids for _ in range(20)]
+    await collection.insert_many(docs)
+
+
+async def bench_pool(args, database_name, session_ids):
+    print(f"\nPool size (mixed 1 insert : 4 history reads, {args.concurrency} concurrent)")
+    for size in args.pool_sizes:
+        options = {**client_options(os.environ), "maxPoolSize": size}
+        client = AsyncIOMotorClient(args.mongo_url, **options)
+        collection = client[database_name].chat_messages
+
+        async def mixed():
+            session_id = random.choice(session_ids)
+            if random.random() < 0.2:
+                await collection.insert_one(message(session_id))
+            else:
+                await collection.find({"session_id": session_id}).sort("timestamp", 1).to_list(1000)
+
+        await drive(f"maxPoolSize={size}", mixed, args.concurrency, args.operations)
+        client.close()
+
+
+async def bench_write(args, database_name, session_ids):
+    print(f"\nWrite concern (chat_messages inserts, {args.concurrency} concurrent)")
+    client = AsyncIOMotorClient(args.mongo_url, **client_options(os.environ))
+    for spec in args.write_concerns:
+        collection = client[database_name].get_collection("chat_messages", write_concern=parse_write_concern(spec))
+
+        async def insert():
+            await collection.insert_one(message(random.choice(session_ids)))
+
+        await drive(f"w={spec}", insert, args.concurrency, args.operations)
+    client.close()
+
+
+async def bench_read(args, database_name, session_ids):
+    print(f"\nRead preference (history reads, {args.concurrency} concurrent)")
+    client = AsyncIOMotorClient(args.mongo_url, **client_options(os.environ))
+    for name in args.read_preferences:
+        collection = client[database_name].get_collection("chat_messages", read_preference=read_preference(name))
+
+        async def history():
+            session_id = random.choice(session_ids)
+            await collection.find({"session_id": session_id}).sort("timestamp", 1).to_list(1000)
+
+        await drive(name, history, args.concurrency, args.operations)
+    client.close()
+
+
+def split(value: str):
+    return [part.strip() for part in value.split(",") if part.strip()]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongo-url", default=os.environ.get("MONGO_URL"))
+    parser.add_argument("--only", type=split, default=["pool", "write", "read"])
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--operations", type=int, default=5000)
+    parser.add_argument("--pool-sizes", type=lambda v: [int(p) for p in split(v)], default=[10, 50, 100])
+    parser.add_argument("--write-concerns", type=split, default=["0", "1", "majority", "majority;j=true"])
+    parser.add_argument("--read-preferences", type=split, default=["primary", "secondaryPreferred", "nearest"])
+    args = parser.parse_args()
+    if not args.mongo_url:
+        parser.error("set MONGO_URL or pass --mongo-url")
+
+    database_name = f"bench_{uuid.uuid4().hex[:8]}"
+    session_ids = [str(uuid.uuid4()) for _ in range(SESSIONS)]
+    admin = AsyncIOMotorClient(args.mongo_url, **client_options(os.environ))
+    try:
+        await seed(admin[database_name].chat_messages, session_ids)
+        print(f"Scratch database {database_name}: {SESSIONS} sessions x 20 messages")
+        for name, bench in (("pool", bench_pool), ("write", bench_write), ("read", bench_read)):
+            if name in args.only:
+                await bench(args, database_name, session_ids)
+    finally:
+        await admin.drop_database(database_name)
+        admin.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,128 @@
+"""
+Cold-start benchmark for the backend.
+
+Measures, over several fresh processes:
+
+    import      time to `import server` (and which heavy modules it pulled in)
+    listening   spawn of `uvicorn server:app` until GET /api/ answers
+    ready       spawn until GET /api/ready answers 200 (warm-up finished)
+    first chat  latency of the first and second POST /api/chat/message (--chat)
+
+The environment is passed through, so run it with the settings to measure,
+e.g. DB_BACKEND=mongo MONGO_URL=... N8N_WEBHOOK_URL=... . With --chat and no
+webhook configured the replies are the local "not configured" message, which
+still exercises the session and message path.
+
+Usage (from the backend directory):
+    python benchmarks/bench_startup.py [--runs 5] [--chat]
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+HEAVY_MODULES = ("motor", "pymongo", "httpx", "dotenv", "email_validator")
+
+IMPORT_PROBE = f"""
+import sys, time, json
+started = time.perf_counter()
+import server
+elapsed = time.perf_counter() - started
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))
+"""
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def request(url: str, body=None, timeout: float = 30.0):
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"} if data else {})
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as response:
+            return response.status, json.loads(response.read() or b"null")
+    except urllib.error.HTTPError as e:
+        return e.code, None
+
+
+def measure_import(env):
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_PROBE], cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def measure_boot(env, chat: bool, deadline: float = 60.0):
+    port = free_port()
+    base = f"http://127.0.0.1:{port}/api"
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "server:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    result = {}
+    try:
+        while "ready" not in result:
+            if time.perf_counter() - started > deadline:
+                raise RuntimeError("server did not become ready in time")
+            try:
+                if "listening" not in result:
+                    if request(f"{base}/", timeout=1)[0] == 200:
+                        result["listening"] = time.perf_counter() - started
+                elif request(f"{base}/ready", timeout=1)[0] == 200:
+                    result["ready"] = time.perf_counter() - started
+            except (urllib.error.URLError, ConnectionError, socket.timeout):
+                pass
+            time.sleep(0.005)
+
+        if chat:
+            _, session = request(f"{base}/chat/session", {"user_name": "Bench", "user_email": "bench@example.com"})
+            for key in ("first_chat", "second_chat"):
+                sent = time.perf_counter()
+                request(f"{base}/chat/message", {"session_id": session["id"], "message": "Do you cater?"})
+                result[key] = time.perf_counter() - sent
+    finally:
+        process.terminate()
+        process.wait()
+    return result
+
+
+def report(label: str, values):
+    values = [v * 1000 for v in values]
+    print(f"  {label:<12} median {statistics.median(values):>8.1f} ms   min {min(values):>8.1f} ms   max {max(values):>8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--chat", action="store_true", help="also time the first two chat messages")
+    args = parser.parse_args()
+
+    env = {**os.environ, "LOG_LEVEL": os.environ.get("LOG_LEVEL", "WARNING")}
+    imports = [measure_import(env) for _ in range(args.runs)]
+    boots = [measure_boot(env, args.chat) for _ in range(args.runs)]
+
+    print(f"{args.runs} runs, DB_BACKEND={env.get('DB_BACKEND') or '(default)'}")
+    report("import", [i["seconds"] for i in imports])
+    for key in ("listening", "ready", "first_chat", "second_chat"):
+        if key in boots[0]:
+            report(key.replace("_", " "), [b[key] for b in boots])
+    print(f"  heavy modules loaded at import: {', '.join(imports[0]['loaded']) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
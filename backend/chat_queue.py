@@ -0,0 +1,104 @@
+"""
+Background processing for chat messages (CHAT_ASYNC_MODE).
+
+POST /api/chat/message stores the user message, enqueues a job and returns
+202 immediately; a fixed pool of worker tasks calls the n8n webhook and
+stores the bot reply. Clients pick the reply up through the long-poll
+endpoint, which waits on MessageNotifier.
+"""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ChatJobQueue:
+    def __init__(
+        self,
+        handler: Callable[[Any], Awaitable[None]],
+        on_timeout: Callable[[Any], Awaitable[None]],
+        maxsize: int = 1000,
+        workers: int = 8,
+        deadline: float = 45.0,
+    ):
+        self._handler = handler
+        self._on_timeout = on_timeout
+        self.maxsize = maxsize
+        self.workers = workers
+        self.deadline = deadline
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    def full(self) -> bool:
+        return self._queue is not None and self._queue.full()
+
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def submit(self, job: Any):
+        """Enqueue a job; raises asyncio.QueueFull when at capacity"""
+        self._queue.put_nowait(job)
+
+    async def start(self):
+        self._queue = asyncio.Queue(maxsize=self.maxsize)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self.depth():
+            logger.warning("Dropping queued chat jobs on shutdown", extra={"jobs": self.depth()})
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                await asyncio.wait_for(self._handler(job), self.deadline)
+            except asyncio.TimeoutError:
+                logger.error("Chat job exceeded its deadline", extra={"deadline": self.deadline})
+                try:
+                    await self._on_timeout(job)
+                except Exception as e:
+                    # Must not escape: the worker would die and the pool shrink for good
+                    logger.error("Chat job timeout handling failed", extra={"error": repr(e)})
+            except Exception as e:
+                logger.error("Chat job failed", extra={"error": repr(e)})
+            finally:
+                self._queue.task_done()
+
+
+class MessageNotifier:
+    """Wakes long-poll requests waiting for new messages in a session"""
+
+    def __init__(self):
+        self._events: Dict[str, asyncio.Event] = {}
+        self._waiters: Dict[str, int] = {}
+
+    def notify(self, session_id: str):
+        event = self._events.pop(session_id, None)
+        if event is not None:
+            event.set()
+
+    async def wait(self, session_id: str, timeout: float) -> bool:
+        """Wait until notify(session_id) or timeout; True if notified"""
+        event = self._events.get(session_id)
+        if event is None:
+            event = self._events[session_id] = asyncio.Event()
+        self._waiters[session_id] = self._waiters.get(session_id, 0) + 1
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            remaining = self._waiters[session_id] - 1
+            if remaining:
+                self._waiters[session_id] = remaining
+            else:
+                # Last waiter gone: forget the session
+                del self._waiters[session_id]
+                if self._events.get(session_id) is event:
+                    del self._events[session_id]
@@ -0,0 +1,37 @@
+"""
+Per-process cache of a DB-stored value kept coherent across workers.
+
+Writers bump a shared version counter after changing the value. Each worker
+re-reads that counter at most once per refresh interval and reloads the
+value only when the version moved, so config updates made through any worker
+reach every worker within one interval without a DB read per request.
+"""
+import time
+from typing import Any, Awaitable, Callable
+
+
+class VersionedCache:
+    def __init__(self, counters, key: str, loader: Callable[[], Awaitable[Any]], refresh_interval: float = 1.0):
+        self._counters = counters
+        self._key = key
+        self._loader = loader
+        self.refresh_interval = refresh_interval
+        self._value: Any = None
+        self._version = -1
+        self._checked_at = float("-inf")
+
+    async def get(self) -> Any:
+        now = time.monotonic()
+        if now - self._checked_at >= self.refresh_interval:
+            version = await self._counters.get(self._key)
+            if version != self._version:
+                self._value = await self._loader()
+                self._version = version
+            self._checked_at = now
+        return self._value
+
+    async def bump(self) -> int:
+        """Record a change made by this process and drop the local copy"""
+        version = await self._counters.incr(self._key)
+        self._checked_at = float("-inf")
+        return version
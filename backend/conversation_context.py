@@ -0,0 +1,63 @@
+"""
+Conversation context for the n8n webhook payload.
+
+build_context() turns a session's most recent messages (oldest first, as
+kept by history_cache) into the list sent as "context" alongside the new
+message, so the workflow does not have to fetch history itself:
+
+    max_turns   at most this many messages stored before the current one
+    max_tokens  approximate token budget for the whole window (0: none);
+                the oldest messages are dropped first, and a newest message
+                that alone exceeds the budget is cut to fit
+    max_chars   every message is cut to this many characters (0: none)
+
+Tokens are estimated as one per four characters plus a small per-message
+overhead, which is close enough for budgeting without a tokenizer.
+"""
+from typing import Dict, List, Optional
+
+CHARS_PER_TOKEN = 4
+# Role marker and separators a chat prompt adds per message
+MESSAGE_OVERHEAD_TOKENS = 4
+ELLIPSIS = "…"
+
+
+def estimate_tokens(text: str) -> int:
+    return MESSAGE_OVERHEAD_TOKENS + (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def truncate(text: str, max_chars: int) -> str:
+    if max_chars <= 0 or len(text) <= max_chars:
+        return text
+    return text[: max(0, max_chars - len(ELLIPSIS))] + ELLIPSIS
+
+
+def build_context(
+    messages: List,
+    current_id: Optional[str],
+    max_turns: int,
+    max_tokens: int = 0,
+    max_chars: int = 0,
+) -> List[Dict]:
+    """The bounded window of messages before current_id (all of them when it is absent), oldest first"""
+    if max_turns <= 0:
+        return []
+    ids = [m.id for m in messages]
+    if current_id in ids:
+        messages = messages[: ids.index(current_id)]
+    window = []
+    budget = max_tokens
+    for message in reversed(messages[-max_turns:]):
+        text = truncate(message.message, max_chars)
+        if max_tokens > 0:
+            cost = estimate_tokens(text)
+            if cost > budget:
+                room = (budget - MESSAGE_OVERHEAD_TOKENS) * CHARS_PER_TOKEN
+                if window or room <= len(ELLIPSIS):
+                    break
+                text = truncate(text, room)
+                cost = budget
+            budget -= cost
+        window.append({"sender": message.sender, "message": text, "timestamp": message.timestamp.isoformat()})
+    window.reverse()
+    return window
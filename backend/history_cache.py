@@ -0,0 +1,135 @@
+"""
+Per-process cache of each session's most recent chat messages.
+
+Every session entry is a deque of at most max_messages ChatMessage models
+tagged with the session's version counter (bumped once per stored message,
+shared by all workers). Readers pass the version they just read, so an entry
+is only served while nothing was written behind this process's back; a
+mismatch is a miss and the caller refills from the database.
+
+Only two kinds of entries exist: sessions this process created (start(),
+empty and complete) and sessions filled from the database. A version number
+alone never proves a session had no earlier messages (rows may predate the
+counter), so appends to unknown sessions are ignored. Entries are appended
+in place as this process stores messages, and dropped whenever an append
+cannot be proven to be the very next write (a version gap or an
+out-of-order message). Sessions are evicted least recently used first
+to stay under max_sessions and an approximate max_bytes budget.
+"""
+from collections import OrderedDict, deque
+from typing import Deque, List, Optional
+
+from ids import is_uuid7
+
+# Rough per-message footprint of a cached ChatMessage besides its text
+# (model instance, field dict, id strings, datetime)
+MESSAGE_OVERHEAD = 600
+
+
+def _message_size(message) -> int:
+    return MESSAGE_OVERHEAD + len(message.message)
+
+
+class _SessionHistory:
+    __slots__ = ("messages", "version", "complete", "size")
+
+    def __init__(self, max_messages: int, version: int, complete: bool):
+        self.messages: Deque = deque(maxlen=max_messages)
+        self.version = version
+        # True while the deque holds the session's entire history
+        self.complete = complete
+        self.size = 0
+
+
+class HistoryCache:
+    def __init__(self, max_messages: int = 50, max_sessions: int = 10000, max_bytes: int = 64 * 2**20):
+        self.max_messages = max_messages
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self._sessions: "OrderedDict[str, _SessionHistory]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_messages > 0
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get(self, session_id: str, version: int, limit: Optional[int] = None) -> Optional[List]:
+        """The newest `limit` messages (all when None), oldest first, or None on a miss"""
+        entry = self._sessions.get(session_id)
+        if (
+            entry is None
+            or entry.version != version
+            or not (entry.complete or (limit is not None and limit <= len(entry.messages)))
+        ):
+            self.misses += 1
+            return None
+        self._sessions.move_to_end(session_id)
+        self.hits += 1
+        messages = list(entry.messages)
+        return messages[-limit:] if limit is not None else messages
+
+    def fill(self, session_id: str, version: int, messages: List, complete: bool):
+        """Store messages read from the database (oldest first) at `version`"""
+        if not self.enabled:
+            return
+        entry = _SessionHistory(self.max_messages, version, complete and len(messages) <= self.max_messages)
+        for message in messages[-self.max_messages:]:
+            entry.messages.append(message)
+            entry.size += _message_size(message)
+        self._replace(session_id, entry)
+
+    def start(self, session_id: str):
+        """Track a session this process just created: its history is known to be empty"""
+        if self.enabled:
+            self._replace(session_id, _SessionHistory(self.max_messages, 0, True))
+
+    def append(self, session_id: str, message, version: int):
+        """Record a message this process stored; `version` is the counter value after it"""
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            return
+        if entry.version != version - 1 or not self._in_order(session_id, entry, message):
+            self.discard(session_id)
+            return
+        if len(entry.messages) == self.max_messages:
+            entry.complete = False
+            entry.size -= _message_size(entry.messages[0])
+            self._bytes -= _message_size(entry.messages[0])
+        entry.messages.append(message)
+        entry.version = version
+        size = _message_size(message)
+        entry.size += size
+        self._bytes += size
+        self._sessions.move_to_end(session_id)
+        self._evict()
+
+    def discard(self, session_id: str):
+        entry = self._sessions.pop(session_id, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    @staticmethod
+    def _in_order(session_id: str, entry: _SessionHistory, message) -> bool:
+        """Appending keeps the deque in the order history reads sort by"""
+        if not entry.messages:
+            return True
+        last = entry.messages[-1]
+        if message.timestamp < last.timestamp:
+            return False
+        return not is_uuid7(session_id) or message.id > last.id
+
+    def _replace(self, session_id: str, entry: _SessionHistory):
+        self.discard(session_id)
+        self._sessions[session_id] = entry
+        self._bytes += entry.size
+        self._evict()
+
+    def _evict(self):
+        while self._sessions and (len(self._sessions) > self.max_sessions or self._bytes > self.max_bytes):
+            _, entry = self._sessions.popitem(last=False)
+            self._bytes -= entry.size
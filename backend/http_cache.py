@@ -0,0 +1,65 @@
+"""
+Conditional GET and response compression helpers for read endpoints.
+
+Endpoints compute a strong ETag from cheap metadata (a version counter or a
+small payload) before doing any real work, answer 304 when the client's
+If-None-Match still matches, and otherwise send the JSON body, gzipped when
+the client accepts it and the body is at least the configured size.
+"""
+import gzip
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response
+
+GZIP_SUFFIX = "-gzip"
+BROTLI_SUFFIX = "-br"
+
+
+def make_etag(*parts) -> str:
+    return '"' + ".".join(str(p) for p in parts if p != "") + '"'
+
+
+def payload_etag(body: bytes) -> str:
+    return make_etag(hashlib.blake2b(body, digest_size=12).hexdigest())
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True if If-None-Match names this ETag (in any content encoding)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        for suffix in (GZIP_SUFFIX, BROTLI_SUFFIX):
+            if candidate.endswith(suffix + '"'):
+                candidate = candidate[: -len(suffix) - 1] + '"'
+        if candidate == etag:
+            return True
+    return False
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+
+def json_response(request: Request, body: bytes, etag: Optional[str] = None, compress_min_bytes: int = 0) -> Response:
+    """Build a JSON response, gzip-compressed when worthwhile and accepted"""
+    headers = {"Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if (
+        compress_min_bytes > 0
+        and len(body) >= compress_min_bytes
+        and "gzip" in request.headers.get("accept-encoding", "")
+    ):
+        body = gzip.compress(body, compresslevel=6)
+        headers["Content-Encoding"] = "gzip"
+        if etag is not None:
+            # A strong validator must differ between encodings
+            etag = etag[:-1] + GZIP_SUFFIX + '"'
+    if etag is not None:
+        headers["ETag"] = etag
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,57 @@
+"""
+Time-ordered identifiers (UUIDv7, RFC 9562).
+
+    48 bits  unix time in milliseconds
+     4 bits  version (7)
+    12 bits  counter, randomly seeded each millisecond (method 1 of the RFC)
+     2 bits  variant
+    62 bits  random
+
+Ids from one process are strictly increasing, even for many ids within the
+same millisecond or when the wall clock steps back, so sorting ids (as
+strings or as 16-byte values) sorts records by creation time. Ids from
+different workers interleave by millisecond. They are still canonical UUID
+strings, so code that stores or parses uuid4 ids keeps working. is_uuid7()
+tells the two apart where ordering matters.
+"""
+import os
+import threading
+import time
+import uuid
+from typing import Optional
+
+_MAX_COUNTER = 0xFFF
+
+_lock = threading.Lock()
+_last_ms = 0
+_counter = 0
+
+
+def uuid7() -> uuid.UUID:
+    global _last_ms, _counter
+    with _lock:
+        ms = time.time_ns() // 1_000_000
+        if ms > _last_ms:
+            _last_ms = ms
+            # Seed below the midpoint so a busy millisecond has room to count up
+            _counter = int.from_bytes(os.urandom(2), "big") & 0x7FF
+        else:
+            # Same millisecond, or the clock went backwards: keep counting
+            _counter += 1
+            if _counter > _MAX_COUNTER:
+                _last_ms += 1
+                _counter = 0
+        ms, counter = _last_ms, _counter
+    tail = int.from_bytes(os.urandom(8), "big") & 0x3FFF_FFFF_FFFF_FFFF
+    return uuid.UUID(int=(ms << 80) | (0x7 << 76) | (counter << 64) | (0b10 << 62) | tail)
+
+
+def new_id() -> str:
+    """Default factory for document ids"""
+    return str(uuid7())
+
+
+def is_uuid7(value: Optional[str]) -> bool:
+    """True for canonical UUIDv7 strings (cheap check, no parsing)"""
+    return isinstance(value, str) and len(value) == 36 and value[14] == "7" and value[8] == "-"
+
@@ -0,0 +1,769 @@
+"""
+In-memory stand-in for the Mongo collections used by server.py.
+
+Used for local development, tests and small single-process deployments.
+Optionally backed by a journal (see journal.py) so data survives restarts.
+
+Concurrency: readers never lock. Stored documents are never mutated in place
+and the containers holding them are only ever appended to or swapped out as
+a whole, so a reader that captured a reference and a length sees a
+consistent snapshot while writers keep going (from the event loop or from
+threads). Writers of one collection serialize on a small lock.
+
+Collections can keep sorted indexes on string or datetime fields (e.g.
+chat_sessions by id, user_email and created_at). Those are updated in place, so indexed reads take the
+write lock briefly for each chunk they copy out.
+"""
+import itertools
+import operator
+import threading
+import uuid
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+# Mongo-style comparison operators accepted as {"field": {"$op": value}}
+OPERATORS = {
+    "$gt": operator.gt,
+    "$gte": operator.ge,
+    "$lt": operator.lt,
+    "$lte": operator.le,
+}
+
+
+def is_operator(condition: Any) -> bool:
+    return type(condition) is dict and bool(condition) and next(iter(condition)).startswith("$")
+
+
+def match_value(current: Any, condition: Any) -> bool:
+    """Compare a field value with an equality value or an operator dict"""
+    if not is_operator(condition):
+        return current == condition
+    for op, operand in condition.items():
+        if op == "$ne":
+            if current == operand:
+                return False
+        elif op == "$in":
+            if current not in operand:
+                return False
+        elif op in OPERATORS:
+            # Like Mongo, range comparisons never match a missing field
+            if current is None or not OPERATORS[op](current, operand):
+                return False
+        else:
+            raise ValueError(f"Unsupported query operator: {op}")
+    return True
+
+
+def sort_keys(key, direction: Optional[int] = None) -> List[Tuple[str, int]]:
+    """Normalize sort("field", 1) and sort([("field", 1), ...]) like pymongo"""
+    if isinstance(key, str):
+        return [(key, 1 if direction is None else direction)]
+    return [(field, d) for field, d in key]
+
+
+def _sort_docs(items: List[Dict[str, Any]], keys: List[Tuple[str, int]]):
+    # Stable sorts applied from the last key to the first
+    for field, direction in reversed(keys):
+        items.sort(key=lambda x: x.get(field), reverse=direction == -1)
+
+
+def matches(item: Dict[str, Any], filter: Optional[Dict[str, Any]]) -> bool:
+    """Return True if the document matches a filter"""
+    if not filter:
+        return True
+    return all(match_value(item.get(k), v) for k, v in filter.items())
+
+
+class InMemoryCursor:
+    def __init__(self, items):
+        self._items = list(items)
+
+    def sort(self, key, direction: Optional[int] = None):
+        _sort_docs(self._items, sort_keys(key, direction))
+        return self
+
+    async def to_list(self, length: int):
+        return [dict(item) for item in self._items[:length]]
+
+
+class IndexedCursor:
+    """Cursor of a collection with indexes; the query is planned in to_list()"""
+
+    def __init__(self, collection: "InMemoryCollection", filter: Optional[Dict[str, Any]]):
+        self._collection = collection
+        self._filter = filter or {}
+        self._sort = None
+
+    def sort(self, key, direction: Optional[int] = None):
+        self._sort = sort_keys(key, direction)
+        return self
+
+    async def to_list(self, length: int):
+        return [dict(item) for item in self._collection._select(self._filter, self._sort, length)]
+
+
+_AFTER_ALL = float("inf")  # seq above every real one: (value, _AFTER_ALL) sorts after all keys of value
+_INDEX_CHUNK = 512
+
+
+# Values each index kind holds; anything else is left out of the index
+INDEX_KINDS = {
+    "str": lambda value: isinstance(value, str),
+    # Naive and aware datetimes cannot be compared with each other
+    "datetime": lambda value: type(value) is datetime and value.tzinfo is None,
+}
+
+
+def _key_bounds(condition: Any, indexable):
+    """[lower, upper) key bounds for an equality or range condition on indexable values, or None"""
+    if indexable(condition):
+        return (condition, 0), (condition, _AFTER_ALL)
+    if not is_operator(condition):
+        return None
+    lower = upper = None
+    for op, operand in condition.items():
+        if op not in OPERATORS or not indexable(operand):
+            return None
+        if op in ("$gt", "$gte"):
+            bound = (operand, _AFTER_ALL if op == "$gt" else 0)
+            lower = bound if lower is None else max(lower, bound)
+        else:
+            bound = (operand, _AFTER_ALL if op == "$lte" else 0)
+            upper = bound if upper is None else min(upper, bound)
+    return lower, upper
+
+
+class _SortedIndex:
+    """Documents ordered by one field, for equality, range and sorted scans
+
+    Entries are (value, seq) keys with their documents, kept in sorted chunks
+    of at most 2 * _INDEX_CHUNK (a simple sorted list of lists, so an insert
+    only shifts one small chunk); _maxes holds the last key of every chunk.
+    seq (insertion order) makes keys unique, so a scan can resume right after
+    the last key it returned however the chunks changed in between.
+    Documents whose value is not of the index kind (INDEX_KINDS) are not indexed.
+    """
+
+    __slots__ = ("field", "indexable", "_lock", "_keys", "_docs", "_maxes", "_seq", "_len")
+
+    def __init__(self, field: str, kind: str, lock):
+        self.field = field
+        self.indexable = INDEX_KINDS[kind]
+        self._lock = lock
+        self._keys: List[List] = []
+        self._docs: List[List[Dict[str, Any]]] = []
+        self._maxes: List = []
+        self._seq = 0
+        self._len = 0
+
+    def __len__(self) -> int:
+        return self._len
+
+    def add(self, doc: Dict[str, Any]):
+        """Index a new document (caller holds the lock)"""
+        value = doc.get(self.field)
+        if not self.indexable(value):
+            return
+        self._seq += 1
+        self._len += 1
+        key = (value, self._seq)
+        if not self._maxes:
+            self._keys.append([key])
+            self._docs.append([doc])
+            self._maxes.append(key)
+            return
+        i = min(bisect_left(self._maxes, key), len(self._maxes) - 1)
+        keys, docs = self._keys[i], self._docs[i]
+        position = bisect_left(keys, key)
+        keys.insert(position, key)
+        docs.insert(position, doc)
+        self._maxes[i] = keys[-1]
+        if len(keys) > 2 * _INDEX_CHUNK:
+            self._keys[i:i + 1] = [keys[:_INDEX_CHUNK], keys[_INDEX_CHUNK:]]
+            self._docs[i:i + 1] = [docs[:_INDEX_CHUNK], docs[_INDEX_CHUNK:]]
+            self._maxes[i:i + 1] = [keys[_INDEX_CHUNK - 1], keys[-1]]
+
+    def rebuild(self, docs: Iterable[Dict[str, Any]]):
+        """Replace the contents, e.g. after a delete (caller holds the lock)"""
+        entries = sorted(
+            ((doc[self.field], seq), doc)
+            for seq, doc in enumerate(docs, 1)
+            if self.indexable(doc.get(self.field))
+        )
+        chunks = [entries[i:i + _INDEX_CHUNK] for i in range(0, len(entries), _INDEX_CHUNK)]
+        self._keys = [[key for key, _ in chunk] for chunk in chunks]
+        self._docs = [[doc for _, doc in chunk] for chunk in chunks]
+        self._maxes = [keys[-1] for keys in self._keys]
+        self._seq = self._len = len(entries)
+
+    def _rank(self, key) -> int:
+        """Number of entries below key"""
+        i = bisect_left(self._maxes, key)
+        if i == len(self._maxes):
+            return self._len
+        return sum(map(len, self._keys[:i])) + bisect_left(self._keys[i], key)
+
+    def count(self, lower, upper) -> int:
+        """Number of entries with keys in [lower, upper)"""
+        with self._lock:
+            start = self._rank(lower) if lower is not None else 0
+            end = self._rank(upper) if upper is not None else self._len
+        return max(0, end - start)
+
+    def _chunk_after(self, lower, upper):
+        """Entries of the first chunk holding keys >= lower, cut at upper"""
+        i = bisect_left(self._maxes, lower) if lower is not None else 0
+        if i == len(self._maxes):
+            return [], []
+        keys = self._keys[i]
+        start = bisect_left(keys, lower) if lower is not None else 0
+        end = bisect_left(keys, upper) if upper is not None else len(keys)
+        return keys[start:end], self._docs[i][start:end]
+
+    def _chunk_before(self, lower, upper):
+        """Entries of the last chunk holding keys < upper, cut at lower"""
+        i = bisect_left(self._maxes, upper) if upper is not None else len(self._maxes)
+        end = bisect_left(self._keys[i], upper) if i < len(self._maxes) else 0
+        if end == 0:
+            i -= 1
+            if i < 0:
+                return [], []
+            end = len(self._keys[i])
+        keys = self._keys[i]
+        start = bisect_left(keys, lower) if lower is not None else 0
+        return keys[start:end], self._docs[i][start:end]
+
+    def scan(self, lower, upper, reverse: bool = False):
+        """Yield the documents with keys in [lower, upper), copied out a chunk at a time under the lock"""
+        while True:
+            with self._lock:
+                keys, docs = self._chunk_before(lower, upper) if reverse else self._chunk_after(lower, upper)
+            if not docs:
+                return
+            if reverse:
+                upper = keys[0]
+                yield from reversed(docs)
+            else:
+                lower = (keys[-1][0], keys[-1][1] + 1)
+                yield from docs
+
+
+class InMemoryCollection:
+    def __init__(self, name: str = "", indexes: Optional[Dict[str, str]] = None):
+        self.name = name
+        # Append-only; deletes build a new list and swap it in
+        self._items: list[Dict[str, Any]] = []
+        self._write_lock = threading.Lock()
+        self._indexes = {field: _SortedIndex(field, kind, self._write_lock) for field, kind in (indexes or {}).items()}
+        # Set by Journal.attach(); receives every write so it can be persisted
+        self.journal = None
+
+    def _view(self):
+        """Consistent snapshot of the stored documents (the list, not the docs, is copied)"""
+        items = self._items
+        return items[:len(items)]
+
+    # Write primitives shared by the public API and journal replay
+    def _apply_insert(self, doc: Dict[str, Any]):
+        doc = dict(doc)
+        self._items.append(doc)
+        for index in self._indexes.values():
+            index.add(doc)
+
+    def _apply_delete(self, filter: Dict[str, Any]):
+        # Never mutate the current list: readers may still be iterating it
+        if not filter:
+            self._items = []
+        else:
+            self._items = [i for i in self._items if not matches(i, filter)]
+        for index in self._indexes.values():
+            index.rebuild(self._items)
+
+    def _select(self, filter: Dict[str, Any], sort: Optional[List[Tuple[str, int]]], length: int):
+        """Run a query on the indexes where that is cheaper than scanning every document
+
+        Either the index of the first sort key is walked in order until
+        `length` documents match, or the narrowest indexed filter range is
+        collected and sorted; the estimated number of documents visited
+        decides.
+        """
+        ranges = {}
+        for field, condition in filter.items():
+            index = self._indexes.get(field)
+            bounds = _key_bounds(condition, index.indexable) if index is not None else None
+            if bounds is not None:
+                ranges[field] = (index.count(*bounds), bounds)
+        narrowest = min(ranges, key=lambda f: ranges[f][0], default=None)
+
+        field, direction = sort[0] if sort else (None, 1)
+        index = self._indexes.get(field)
+        # Documents missing the sort field would silently drop out of an index walk
+        if index is not None and len(index) == len(self._items):
+            size, bounds = ranges.get(field) or (len(index), (None, None))
+            matching = ranges[narrowest][0] if narrowest is not None else size
+            # Walking the sort index visits ~length * size / matching documents
+            if narrowest is None or length * size < matching * max(matching, 1):
+                docs = (d for d in index.scan(*bounds, reverse=direction == -1) if matches(d, filter))
+                if len(sort) > 1:
+                    # Equal values come in insertion order: order each run by the other keys
+                    docs = (
+                        d
+                        for _, run in itertools.groupby(docs, key=lambda d: d[field])
+                        for d in self._sorted(list(run), sort[1:])
+                    )
+                return list(itertools.islice(docs, length))
+
+        if narrowest is not None:
+            items = [d for d in self._indexes[narrowest].scan(*ranges[narrowest][1]) if matches(d, filter)]
+        else:
+            items = [i for i in self._view() if matches(i, filter)]
+        if sort:
+            _sort_docs(items, sort)
+        return items[:length]
+
+    @staticmethod
+    def _sorted(items: List[Dict[str, Any]], keys: List[Tuple[str, int]]) -> List[Dict[str, Any]]:
+        _sort_docs(items, keys)
+        return items
+
+    def _snapshot(self):
+        """Return all stored documents (used by journal compaction)"""
+        return self._view()
+
+    async def insert_one(self, doc: Dict[str, Any]):
+        with self._write_lock:
+            self._apply_insert(doc)
+            if self.journal is not None:
+                self.journal.record(self.name, "i", doc)
+        return None
+
+    async def find_one(self, filter: Dict[str, Any]):
+        for field, condition in (filter or {}).items():
+            index = self._indexes.get(field)
+            if index is not None and index.indexable(condition):
+                # Newest match first, like the scan below
+                for item in index.scan(*_key_bounds(condition, index.indexable), reverse=True):
+                    if matches(item, filter):
+                        return dict(item)
+                return None
+        for item in reversed(self._view()):
+            if matches(item, filter):
+                return dict(item)
+        return None
+
+    async def count_by(self, field: str, values: Iterable) -> Dict[Any, int]:
+        """Number of documents per value of field, for each of values"""
+        wanted = set(values)
+        index = self._indexes.get(field)
+        if index is not None and all(index.indexable(value) for value in wanted):
+            return {value: index.count(*_key_bounds(value, index.indexable)) for value in wanted}
+        counts = Counter(value for value in (item.get(field) for item in self._view()) if value in wanted)
+        return {value: counts[value] for value in wanted}
+
+    def value_counts(self, field: str) -> Dict[Any, int]:
+        """Number of documents per value of field"""
+        return dict(Counter(item.get(field) for item in self._view()))
+
+    def find(self, filter: Optional[Dict[str, Any]] = None):
+        if self._indexes:
+            return IndexedCursor(self, filter)
+        items = self._view()
+        if filter:
+            items = [i for i in items if matches(i, filter)]
+        return InMemoryCursor(items)
+
+    async def delete_many(self, filter: Dict[str, Any]):
+        with self._write_lock:
+            self._apply_delete(filter)
+            if self.journal is not None:
+                self.journal.record(self.name, "d", filter or {})
+        return None
+
+
+# Compact columnar storage
+#
+# High-volume collections with a fixed document shape are stored column by
+# column instead of as one dict per document:
+#   "uuid"     canonical UUID strings packed as 16 bytes
+#   "intern"   repeated strings (session ids, client names) as indexes into a
+#              symbol table, with a posting list of rows per symbol
+#   "enum"     a handful of distinct strings ("user"/"bot") as one byte
+#   "datetime" naive UTC datetimes as int64 microseconds since the epoch
+#   "str"      anything else, kept as a plain list
+# Values that do not fit their column (missing fields, aware datetimes,
+# non-UUID ids) and unknown fields go to a per-row overflow dict.
+
+CHAT_MESSAGE_SCHEMA = {
+    "id": "uuid",
+    "session_id": "intern",
+    "message": "str",
+    "sender": "enum",
+    "timestamp": "datetime",
+}
+
+STATUS_CHECK_SCHEMA = {
+    "id": "uuid",
+    "client_name": "intern",
+    "timestamp": "datetime",
+}
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+_MISSING = object()
+_NOT_ENCODABLE = object()
+
+
+class _Field:
+    __slots__ = ("name", "kind", "symbols", "lookup")
+
+    def __init__(self, name: str, kind: str):
+        self.name = name
+        self.kind = kind
+        # Symbol table for "intern"/"enum" fields; append-only, so it can be
+        # shared by every generation of the columns.
+        self.symbols: List[str] = []
+        self.lookup: Dict[str, int] = {}
+
+    def new_column(self):
+        if self.kind == "uuid":
+            return bytearray()
+        if self.kind == "intern":
+            return array("I")
+        if self.kind == "enum":
+            return array("B")
+        if self.kind == "datetime":
+            return array("q")
+        return []
+
+    def encode(self, value):
+        kind = self.kind
+        if kind == "str":
+            return value
+        if kind == "datetime":
+            if type(value) is datetime and value.tzinfo is None:
+                return (value - _EPOCH) // _MICROSECOND
+            return _NOT_ENCODABLE
+        if kind == "uuid":
+            if isinstance(value, str) and len(value) == 36:
+                try:
+                    parsed = uuid.UUID(value)
+                except ValueError:
+                    return _NOT_ENCODABLE
+                if str(parsed) == value:
+                    return parsed.bytes
+            return _NOT_ENCODABLE
+        # intern / enum
+        if not isinstance(value, str):
+            return _NOT_ENCODABLE
+        index = self.lookup.get(value)
+        if index is None:
+            if kind == "enum" and len(self.symbols) >= 255:
+                return _NOT_ENCODABLE
+            index = len(self.symbols)
+            self.symbols.append(value)
+            self.lookup[value] = index
+        return index
+
+    def placeholder(self):
+        if self.kind == "uuid":
+            return bytes(16)
+        return None if self.kind == "str" else 0
+
+    def append(self, column, encoded):
+        if self.kind == "uuid":
+            column += encoded
+        else:
+            column.append(encoded)
+
+    def get(self, column, row: int):
+        kind = self.kind
+        if kind == "str":
+            return column[row]
+        if kind == "datetime":
+            return _EPOCH + timedelta(microseconds=column[row])
+        if kind == "uuid":
+            return str(uuid.UUID(bytes=bytes(column[row * 16:row * 16 + 16])))
+        return self.symbols[column[row]]
+
+
+class _Columns:
+    """One generation of column data; replaced wholesale on delete
+
+    Rows are appended column by column and `size` is bumped last, so a reader
+    that only looks at rows below the size it captured never sees a
+    half-written row.
+    """
+
+    __slots__ = ("data", "overflow", "postings", "size")
+
+    def __init__(self, fields: Iterable[_Field]):
+        self.data = {f.name: f.new_column() for f in fields}
+        self.overflow: Dict[int, Dict[str, Any]] = {}
+        # For "intern" fields: symbol index -> rows holding that value
+        self.postings: Dict[str, Dict[int, array]] = {f.name: {} for f in fields if f.kind == "intern"}
+        self.size = 0
+
+
+class ColumnarCursor:
+    def __init__(self, collection: "ColumnarCollection", columns: _Columns, rows):
+        self._collection = collection
+        self._columns = columns
+        self._rows = rows
+
+    def sort(self, key, direction: Optional[int] = None):
+        rows = list(self._rows)
+        for field, field_direction in reversed(sort_keys(key, direction)):
+            rows.sort(key=self._collection._sort_key(self._columns, field), reverse=field_direction == -1)
+        self._rows = rows
+        return self
+
+    async def to_list(self, length: int):
+        decode = self._collection._decode
+        columns = self._columns
+        return [decode(columns, row) for row in self._rows[:length]]
+
+
+class ColumnarCollection:
+    """Drop-in replacement for InMemoryCollection using a compact layout"""
+
+    def __init__(self, name: str, schema: Dict[str, str]):
+        self.name = name
+        self._fields = {field: _Field(field, kind) for field, kind in schema.items()}
+        self._columns = _Columns(self._fields.values())
+        self._write_lock = threading.Lock()
+        self.journal = None
+
+    # Encoding / decoding
+
+    def _append_row(self, columns: _Columns, doc: Dict[str, Any]):
+        row = columns.size
+        extra = None
+        for name, field in self._fields.items():
+            value = doc.get(name, _MISSING)
+            encoded = _NOT_ENCODABLE if value is _MISSING else field.encode(value)
+            if encoded is _NOT_ENCODABLE:
+                if extra is None:
+                    extra = {}
+                extra[name] = value
+                encoded = field.placeholder()
+            elif field.kind == "intern":
+                posting = columns.postings[name].get(encoded)
+                if posting is None:
+                    posting = columns.postings[name][encoded] = array("I")
+                posting.append(row)
+            field.append(columns.data[name], encoded)
+        if len(doc) > len(self._fields) or extra is not None:
+            for key, value in doc.items():
+                if key not in self._fields:
+                    if extra is None:
+                        extra = {}
+                    extra[key] = value
+        if extra is not None:
+            columns.overflow[row] = extra
+        columns.size = row + 1
+
+    def _get(self, columns: _Columns, row: int, name: str):
+        extra = columns.overflow.get(row)
+        if extra is not None and name in extra:
+            value = extra[name]
+            return None if value is _MISSING else value
+        field = self._fields.get(name)
+        if field is None:
+            return None
+        return field.get(columns.data[name], row)
+
+    def _decode(self, columns: _Columns, row: int) -> Dict[str, Any]:
+        doc = {name: field.get(columns.data[name], row) for name, field in self._fields.items()}
+        extra = columns.overflow.get(row)
+        if extra is not None:
+            for key, value in extra.items():
+                if value is _MISSING:
+                    doc.pop(key, None)
+                else:
+                    doc[key] = value
+        return doc
+
+    def _matches(self, columns: _Columns, row: int, filter: Dict[str, Any]) -> bool:
+        for key, value in filter.items():
+            if not match_value(self._get(columns, row, key), value):
+                return False
+        return True
+
+    def _candidates(self, columns: _Columns, size: int, filter: Optional[Dict[str, Any]]):
+        """Rows below size that may match filter, narrowed by a posting list when possible"""
+        if filter:
+            for key, value in filter.items():
+                field = self._fields.get(key)
+                if field is None or field.kind != "intern" or not isinstance(value, str):
+                    continue
+                index = field.lookup.get(value)
+                posting = columns.postings[key].get(index) if index is not None else None
+                rows = [r for r in posting if r < size] if posting is not None else []
+                # Rows whose value could not be interned live in overflow
+                plain = len(rows)
+                rows.extend(r for r, extra in list(columns.overflow.items()) if r < size and key in extra)
+                if len(rows) != plain:
+                    rows.sort()
+                return rows
+        return range(size)
+
+    def _sort_key(self, columns: _Columns, name: str):
+        field = self._fields.get(name)
+        if field is not None and field.kind == "datetime" and not any(
+            name in extra for extra in list(columns.overflow.values())
+        ):
+            return columns.data[name].__getitem__
+        if field is not None and field.kind == "uuid" and not any(
+            name in extra for extra in list(columns.overflow.values())
+        ):
+            # Packed bytes sort like the canonical hex strings
+            data = columns.data[name]
+            return lambda row: data[row * 16:row * 16 + 16]
+        return lambda row: self._get(columns, row, name)
+
+    # Write primitives shared by the public API and journal replay
+
+    def _apply_insert(self, doc: Dict[str, Any]):
+        self._append_row(self._columns, doc)
+
+    def _apply_delete(self, filter: Dict[str, Any]):
+        old = self._columns
+        fresh = _Columns(self._fields.values())
+        if filter:
+            for row in range(old.size):
+                if not self._matches(old, row, filter):
+                    self._append_row(fresh, self._decode(old, row))
+        self._columns = fresh
+
+    def _snapshot(self):
+        """Lazily decode all rows of the current generation (journal compaction)"""
+        columns = self._columns
+        size = columns.size
+        return (self._decode(columns, row) for row in range(size))
+
+    # Collection API
+
+    async def insert_one(self, doc: Dict[str, Any]):
+        with self._write_lock:
+            self._apply_insert(doc)
+            if self.journal is not None:
+                self.journal.record(self.name, "i", doc)
+        return None
+
+    async def find_one(self, filter: Dict[str, Any]):
+        columns = self._columns
+        for row in reversed(self._candidates(columns, columns.size, filter)):
+            if self._matches(columns, row, filter or {}):
+                return self._decode(columns, row)
+        return None
+
+    async def count_by(self, field: str, values: Iterable) -> Dict[Any, int]:
+        """Number of rows per value of field, for each of values (posting list lengths for "intern" fields)"""
+        columns = self._columns
+        size = columns.size
+        spec = self._fields.get(field)
+        wanted = set(values)
+        if spec is None or spec.kind != "intern":
+            counts = Counter(
+                value for value in (self._get(columns, row, field) for row in range(size)) if value in wanted
+            )
+            return {value: counts[value] for value in wanted}
+        counts = dict.fromkeys(wanted, 0)
+        for value in wanted:
+            index = spec.lookup.get(value) if isinstance(value, str) else None
+            posting = columns.postings[field].get(index) if index is not None else None
+            if posting is not None:
+                # Postings are ascending; rows at or past size are still being written
+                counts[value] = bisect_left(posting, size)
+        for row, extra in list(columns.overflow.items()):
+            if row < size and extra.get(field, _MISSING) in wanted:
+                counts[extra[field]] += 1
+        return counts
+
+    def value_counts(self, field: str) -> Dict[Any, int]:
+        """Number of rows per value of field (read off the posting lists for "intern" fields)"""
+        columns = self._columns
+        size = columns.size
+        spec = self._fields.get(field)
+        if spec is None or spec.kind != "intern":
+            return dict(Counter(self._get(columns, row, field) for row in range(size)))
+        counts: Counter = Counter()
+        for index, posting in list(columns.postings[field].items()):
+            # Postings are ascending; rows at or past size are still being written
+            counts[spec.symbols[index]] += bisect_left(posting, size)
+        for row, extra in list(columns.overflow.items()):
+            if row < size and field in extra:
+                value = extra[field]
+                counts[None if value is _MISSING else value] += 1
+        return dict(counts)
+
+    def find(self, filter: Optional[Dict[str, Any]] = None):
+        columns = self._columns
+        rows = self._candidates(columns, columns.size, filter)
+        if filter:
+            rows = [r for r in rows if self._matches(columns, r, filter)]
+        else:
+            rows = list(rows)
+        return ColumnarCursor(self, columns, rows)
+
+    async def delete_many(self, filter: Dict[str, Any]):
+        with self._write_lock:
+            self._apply_delete(filter)
+            if self.journal is not None:
+                self.journal.record(self.name, "d", filter or {})
+        return None
+
+    def __len__(self):
+        return self._columns.size
+
+
+class InMemoryCounters:
+    """Named monotonically increasing counters (e.g. config version)"""
+
+    def __init__(self):
+        self._values: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        # Counters restart from zero with the process; the epoch keeps values
+        # from different runs apart (e.g. inside ETags).
+        self.epoch = uuid.uuid4().hex[:8]
+
+    async def incr(self, key: str) -> int:
+        with self._lock:
+            value = self._values.get(key, 0) + 1
+            self._values[key] = value
+        return value
+
+    async def get(self, key: str) -> int:
+        return self._values.get(key, 0)
+
+    def load(self, values: Dict[str, int]):
+        """Set counters rebuilt from restored data (they are not journaled themselves)"""
+        with self._lock:
+            self._values.update(values)
+
+
+class InMemoryDB:
+    COLLECTIONS = ("status_checks", "chat_sessions", "chat_messages", "n8n_config")
+    COMPACT_SCHEMAS = {
+        "chat_messages": CHAT_MESSAGE_SCHEMA,
+        "status_checks": STATUS_CHECK_SCHEMA,
+    }
+    # Sorted indexes of dict-per-document collections (field -> INDEX_KINDS):
+    # session lookups by id, newest-first listing and email prefix search
+    INDEXES = {
+        "chat_sessions": {"id": "str", "created_at": "datetime", "user_email": "str"},
+    }
+
+    def __init__(self, compact: bool = True):
+        for name in self.COLLECTIONS:
+            schema = self.COMPACT_SCHEMAS.get(name) if compact else None
+            collection = ColumnarCollection(name, schema) if schema else InMemoryCollection(name, self.INDEXES.get(name))
+            setattr(self, name, collection)
+        self.counters = InMemoryCounters()
+
+    def collections(self) -> Dict[str, InMemoryCollection]:
+        return {name: getattr(self, name) for name in self.COLLECTIONS}
@@ -0,0 +1,121 @@
+"""
+Local intent fast-path: canned answers for common FAQ messages.
+
+The intent table is a JSON file (INTENTS_FILE), e.g.
+
+    {"intents": [
+        {"name": "price", "patterns": ["price", "how much", "cost"], "response": "..."},
+        {"name": "menu", "patterns": ["menu"], "response": "..."}
+    ]}
+
+Patterns are case-insensitive phrases matched on word boundaries (plus a
+trailing "s"/"es", so "prices" hits "price"). Every pattern of every intent is
+compiled into one alternation with a named group per intent, so a message is
+scanned once however large the table gets. A message is answered locally
+only when it is short enough and hits exactly one intent; anything ambiguous
+goes to n8n as before.
+
+The file's mtime is checked at most every reload_interval seconds and the
+table is recompiled when it changes; a broken file keeps the previous table.
+"""
+import json
+import logging
+import os
+import re
+import time
+from collections import Counter
+from typing import Dict, List, NamedTuple, Optional, Pattern
+
+logger = logging.getLogger(__name__)
+
+
+class Intent(NamedTuple):
+    name: str
+    patterns: List[str]
+    response: str
+
+
+def compile_intents(intents: List[Intent]) -> Optional[Pattern]:
+    """One regex with a named group per intent (None for an empty table)"""
+    groups = []
+    for index, intent in enumerate(intents):
+        phrases = sorted({p.strip().lower() for p in intent.patterns if p.strip()}, key=len, reverse=True)
+        if phrases:
+            alternation = "|".join(r"\s+".join(map(re.escape, p.split())) for p in phrases)
+            groups.append(f"(?P<i{index}>{alternation})")
+    if not groups:
+        return None
+    return re.compile(r"\b(?:" + "|".join(groups) + r")(?:e?s)?\b", re.IGNORECASE)
+
+
+def load_intents(path: str) -> List[Intent]:
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    entries = data["intents"] if isinstance(data, dict) else data
+    return [Intent(str(e["name"]), [str(p) for p in e["patterns"]], str(e["response"])) for e in entries]
+
+
+class IntentMatcher:
+    def __init__(self, path: str, reload_interval: float = 2.0, max_message_length: int = 200):
+        self.path = path
+        self.reload_interval = reload_interval
+        self.max_message_length = max_message_length
+        self._intents: List[Intent] = []
+        self._pattern: Optional[Pattern] = None
+        self._mtime = None
+        self._next_check = 0.0
+        self.matched: Counter = Counter()
+        self.passed = 0
+        self.ambiguous = 0
+        self.reload()
+
+    def reload(self):
+        """Recompile the table if the file changed; keep the old one on errors"""
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+            if mtime == self._mtime:
+                return
+            # Remember it even if loading fails, so a broken file logs once
+            self._mtime = mtime
+            intents = load_intents(self.path)
+            pattern = compile_intents(intents)
+        except (OSError, ValueError, KeyError, TypeError, re.error) as e:
+            logger.error("Could not load intents", extra={"path": self.path, "error": repr(e)})
+            return
+        # Swap both together; match() reads them once per call
+        self._intents, self._pattern = intents, pattern
+        logger.info("Loaded intents", extra={"path": self.path, "intents": len(intents)})
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if now >= self._next_check:
+            self._next_check = now + self.reload_interval
+            self.reload()
+
+    def match(self, message: str) -> Optional[Intent]:
+        """The single intent a message hits, or None to pass it to n8n"""
+        self._maybe_reload()
+        intents, pattern = self._intents, self._pattern
+        hits = set()
+        if pattern is not None and len(message) <= self.max_message_length:
+            hits = {m.lastgroup for m in pattern.finditer(message)}
+        if len(hits) != 1:
+            if hits:
+                self.ambiguous += 1
+            self.passed += 1
+            return None
+        intent = intents[int(hits.pop()[1:])]
+        self.matched[intent.name] += 1
+        return intent
+
+    def stats(self) -> Dict:
+        matched = sum(self.matched.values())
+        total = matched + self.passed
+        return {
+            "intents": len(self._intents),
+            "matched": matched,
+            "passed": self.passed,
+            "ambiguous": self.ambiguous,
+            "match_rate": matched / total if total else 0.0,
+            "by_intent": dict(self.matched),
+        }
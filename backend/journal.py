@@ -0,0 +1,240 @@
+"""
+Append-only journal and compacted snapshots for the in-memory database.
+
+Every insert_one/delete_many on an attached collection is queued in memory
+and written to disk in batches by a background task, so the request path
+never waits on file I/O. Once enough records accumulate, a compacted snapshot
+of the whole database is written and the log segments it covers are removed.
+
+On disk (inside IN_MEMORY_JOURNAL_DIR):
+    snapshot-<seq>.jsonl   header line {"seq": N} followed by {"c", "d"} rows
+    journal-<seq>.log      {"s": seq, "c": collection, "o": "i"|"d", "d": doc}
+
+Restore reads the newest snapshot plus the log tail through mmap. A record
+torn by a crash is cut off the end of its segment, so new records never get
+appended after it.
+"""
+import asyncio
+import json
+import logging
+import mmap
+import os
+import threading
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_PREFIX = "snapshot-"
+SEGMENT_PREFIX = "journal-"
+
+
+def _encode_default(value: Any):
+    if isinstance(value, datetime):
+        return {"$dt": value.isoformat()}
+    raise TypeError(f"Cannot journal value of type {type(value).__name__}")
+
+
+def _decode_hook(obj: Dict[str, Any]):
+    if len(obj) == 1 and "$dt" in obj:
+        return datetime.fromisoformat(obj["$dt"])
+    return obj
+
+
+def dumps(obj: Dict[str, Any]) -> bytes:
+    return json.dumps(obj, default=_encode_default, separators=(",", ":")).encode() + b"\n"
+
+
+def loads(line: bytes) -> Dict[str, Any]:
+    return json.loads(line, object_hook=_decode_hook)
+
+
+def _iter_lines(path: Path):
+    """Yield the lines of a file through a read-only memory map"""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for line in iter(mm.readline, b""):
+                yield line
+
+
+def _seq_of(path: Path, prefix: str) -> int:
+    return int(path.name[len(prefix):].split(".", 1)[0])
+
+
+class Journal:
+    def __init__(
+        self,
+        directory: str,
+        flush_interval: float = 0.05,
+        snapshot_every: int = 100_000,
+        fsync: bool = True,
+    ):
+        self.directory = Path(directory)
+        self.flush_interval = flush_interval
+        self.snapshot_every = snapshot_every
+        self.fsync = fsync
+
+        self._db = None
+        self._seq = 0
+        self._snapshot_seq = 0
+        self._pending: List[Tuple[int, str, str, Dict[str, Any]]] = []
+        self._segment = None
+        self._task: Optional[asyncio.Task] = None
+        self._lock = threading.Lock()
+
+    # Setup / restore
+
+    def attach(self, db):
+        """Route writes of every collection in db through this journal"""
+        self._db = db
+        for collection in db.collections().values():
+            collection.journal = self
+
+    def load(self):
+        """Restore the attached database from the latest snapshot and log tail"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        collections = self._db.collections()
+        restored = 0
+
+        snapshots = sorted(self.directory.glob(f"{SNAPSHOT_PREFIX}*.jsonl"), key=lambda p: _seq_of(p, SNAPSHOT_PREFIX))
+        if snapshots:
+            latest = snapshots[-1]
+            lines = _iter_lines(latest)
+            header = loads(next(lines))
+            self._snapshot_seq = header["seq"]
+            for line in lines:
+                row = loads(line)
+                collections[row["c"]]._apply_insert(row["d"])
+                restored += 1
+            for stale in snapshots[:-1]:
+                stale.unlink()
+
+        self._seq = self._snapshot_seq
+        for segment in self._segments():
+            restored += self._replay(segment, collections)
+
+        logger.info("Restored journal", extra={"records": restored, "seq": self._seq})
+        self._open_segment()
+
+    def _replay(self, segment: Path, collections) -> int:
+        """Apply the records of one log segment, cutting off a torn tail"""
+        restored = 0
+        offset = 0
+        with closing(_iter_lines(segment)) as lines:
+            for line in lines:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("record without a line end")
+                    entry = loads(line)
+                except ValueError:
+                    break
+                offset += len(line)
+                if entry["s"] <= self._snapshot_seq:
+                    continue
+                collection = collections[entry["c"]]
+                if entry["o"] == "i":
+                    collection._apply_insert(entry["d"])
+                else:
+                    collection._apply_delete(entry["d"])
+                self._seq = entry["s"]
+                restored += 1
+        if offset < segment.stat().st_size:
+            # Torn write: drop it, or records appended to this segment later
+            # would run into it and be lost on the next restore
+            logger.warning("Truncating torn journal record", extra={"segment": segment.name, "offset": offset})
+            os.truncate(segment, offset)
+        return restored
+
+    # Request path
+
+    def record(self, collection: str, op: str, doc: Dict[str, Any]):
+        """Queue a write for the next batch; never performs I/O"""
+        with self._lock:
+            self._seq += 1
+            self._pending.append((self._seq, collection, op, dict(doc)))
+
+    # Background flushing
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        if self._segment is not None:
+            self._segment.close()
+            self._segment = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+                if self._seq - self._snapshot_seq >= self.snapshot_every:
+                    await self.snapshot()
+            except Exception as e:
+                logger.error("Journal flush failed", extra={"error": repr(e)})
+
+    async def flush(self):
+        if not self._pending:
+            return
+        with self._lock:
+            batch, self._pending = self._pending, []
+        await asyncio.to_thread(self._write_batch, batch)
+
+    def _write_batch(self, batch):
+        data = b"".join(dumps({"s": s, "c": c, "o": o, "d": d}) for s, c, o, d in batch)
+        self._segment.write(data)
+        self._segment.flush()
+        if self.fsync:
+            os.fsync(self._segment.fileno())
+
+    # Compaction
+
+    async def snapshot(self):
+        """Write a compacted snapshot and drop the log segments it covers"""
+        await self.flush()
+        seq = self._seq
+        # Documents are never mutated in place, so shallow copies are a
+        # consistent view even while new writes keep arriving.
+        state = {name: c._snapshot() for name, c in self._db.collections().items()}
+        self._segment.close()
+        self._open_segment()
+        current = Path(self._segment.name)
+        covered = [p for p in self._segments() if p != current]
+        await asyncio.to_thread(self._write_snapshot, seq, state, covered)
+        self._snapshot_seq = seq
+
+    def _write_snapshot(self, seq: int, state, covered: List[Path]):
+        final = self.directory / f"{SNAPSHOT_PREFIX}{seq:020d}.jsonl"
+        tmp = final.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            f.write(dumps({"seq": seq}))
+            for name, docs in state.items():
+                f.writelines(dumps({"c": name, "d": doc}) for doc in docs)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, final)
+        for old in self.directory.glob(f"{SNAPSHOT_PREFIX}*.jsonl"):
+            if old != final:
+                old.unlink()
+        for segment in covered:
+            segment.unlink()
+        logger.info("Wrote journal snapshot", extra={"seq": seq})
+
+    def _segments(self) -> List[Path]:
+        return sorted(self.directory.glob(f"{SEGMENT_PREFIX}*.log"), key=lambda p: _seq_of(p, SEGMENT_PREFIX))
+
+    def _open_segment(self):
+        path = self.directory / f"{SEGMENT_PREFIX}{self._seq + 1:020d}.log"
+        self._segment = open(path, "ab")
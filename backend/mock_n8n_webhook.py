@@ -6,7 +6,17 @@ from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 from datetime import datetime
+import os
 import random
+import logging
+from log_pipeline import setup_logging
+
+setup_logging(
+    level=os.environ.get("LOG_LEVEL", "INFO"),
+    fmt=os.environ.get("LOG_FORMAT", "json"),
+    sample_rates=os.environ.get("LOG_SAMPLE_RATES", ""),
+)
+logger = logging.getLogger("mock_n8n_webhook")
 
 app = FastAPI(title="Mock n8n Webhook")
 
@@ -48,7 +58,8 @@ async def handle_chat_webhook(request: Request):
         "user_name": "John Doe",
         "user_email": "john@example.com",
         "message": "User's message",
-        "timestamp": "ISO timestamp"
+        "timestamp": "ISO timestamp",
+        "context": [{"sender": "user", "message": "...", "timestamp": "..."}]  # with N8N_CONTEXT_TURNS
     }
     """
     data = await request.json()
@@ -71,10 +82,9 @@ async def handle_chat_webhook(request: Request):
     if "?" in data.get("message", ""):
         response_text = f"Great question! {response_text}"
 
-    # Log the interaction
-    print(f"\n[{datetime.now().strftime('%H:%M:%S')}] Received message from {user_name}")
-    print(f"User: {data.get('message')}")
-    print(f"Bot: {response_text}\n")
+    # Log the interaction (full texts only at DEBUG level)
+    logger.info("Received message", extra={"session_id": data.get("session_id"), "user_name": user_name})
+    logger.debug("Conversation turn", extra={"user": data.get("message"), "bot": response_text})
 
     # Return response in the format expected by the backend
     return {
@@ -0,0 +1,169 @@
+"""
+Helpers for the MongoDB backend that go beyond the plain collection API.
+
+Connection pool sizing and timeouts come from MONGO_* environment variables,
+and each collection can carry its own write concern (MONGO_WRITE_CONCERNS),
+e.g. a relaxed w=1 for chat transcripts and majority for the webhook config.
+The indexes the queries in server.py rely on are created by ensure_indexes().
+"""
+import logging
+from typing import Any, Dict, List, Mapping, Optional
+
+from pymongo import ASCENDING, DESCENDING, ReadPreference, ReturnDocument
+from pymongo.write_concern import WriteConcern
+
+# Client keyword argument for each pool/timeout environment variable
+CLIENT_OPTIONS = {
+    "MONGO_MAX_POOL_SIZE": "maxPoolSize",
+    "MONGO_MIN_POOL_SIZE": "minPoolSize",
+    "MONGO_MAX_IDLE_TIME_MS": "maxIdleTimeMS",
+    "MONGO_WAIT_QUEUE_TIMEOUT_MS": "waitQueueTimeoutMS",
+    "MONGO_CONNECT_TIMEOUT_MS": "connectTimeoutMS",
+    "MONGO_SOCKET_TIMEOUT_MS": "socketTimeoutMS",
+    "MONGO_SERVER_SELECTION_TIMEOUT_MS": "serverSelectionTimeoutMS",
+}
+
+logger = logging.getLogger(__name__)
+
+# Indexes per collection: history is read per session in id order (UUIDv7
+# sessions) or timestamp order (older uuid4 sessions); chat_sessions are
+# looked up by id, listed newest first by (created_at, id) and searched by
+# email or email prefix; status checks and rollups are read newest first,
+# per client or for all, and rollups are upserted by their bucket
+INDEXES = {
+    "status_checks": [
+        {"keys": [("client_name", ASCENDING), ("timestamp", DESCENDING)]},
+        {"keys": [("timestamp", DESCENDING)]},
+    ],
+    "status_rollups": [
+        {"keys": [("client_name", ASCENDING), ("granularity", ASCENDING), ("bucket", DESCENDING)], "unique": True},
+        {"keys": [("granularity", ASCENDING), ("bucket", DESCENDING)]},
+    ],
+    "chat_messages": [
+        {"keys": [("session_id", ASCENDING), ("id", ASCENDING)]},
+        {"keys": [("session_id", ASCENDING), ("timestamp", ASCENDING)]},
+    ],
+    "chat_sessions": [
+        {"keys": [("id", ASCENDING)], "unique": True},
+        {"keys": [("created_at", DESCENDING), ("id", DESCENDING)]},
+        {"keys": [("user_email", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)]},
+    ],
+}
+
+READ_PREFERENCES = {
+    "primary": ReadPreference.PRIMARY,
+    "primaryPreferred": ReadPreference.PRIMARY_PREFERRED,
+    "secondary": ReadPreference.SECONDARY,
+    "secondaryPreferred": ReadPreference.SECONDARY_PREFERRED,
+    "nearest": ReadPreference.NEAREST,
+}
+
+
+def client_options(environ: Mapping[str, str]) -> Dict[str, int]:
+    """AsyncIOMotorClient keyword arguments for the MONGO_* variables that are set"""
+    return {option: int(environ[name]) for name, option in CLIENT_OPTIONS.items() if environ.get(name)}
+
+
+def parse_write_concern(spec: str) -> WriteConcern:
+    """Parse "majority", "1" or "majority;j=true;wtimeout=5000" """
+    w, *options = (part.strip() for part in spec.split(";"))
+    kwargs: Dict[str, Any] = {"w": int(w) if w.isdigit() else w}
+    for option in options:
+        name, _, value = option.partition("=")
+        if name == "j":
+            kwargs["j"] = value.lower() == "true"
+        elif name == "wtimeout":
+            kwargs["wtimeout"] = int(value)
+        else:
+            raise ValueError(f"Unknown write concern option: {name}")
+    return WriteConcern(**kwargs)
+
+
+def parse_write_concerns(spec: str) -> Dict[str, WriteConcern]:
+    """Parse "collection=concern,collection=concern" (the MONGO_WRITE_CONCERNS format)"""
+    concerns = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, concern = item.partition("=")
+        concerns[name.strip()] = parse_write_concern(concern)
+    return concerns
+
+
+def read_preference(name: str):
+    try:
+        return READ_PREFERENCES[name]
+    except KeyError:
+        raise ValueError(f"Unknown read preference: {name}") from None
+
+
+async def ensure_indexes(database, indexes: Dict[str, List[Dict[str, Any]]] = INDEXES):
+    """Create missing indexes (a no-op for the ones that already exist)"""
+    for name, specs in indexes.items():
+        collection = getattr(database, name)
+        for spec in specs:
+            options = {k: v for k, v in spec.items() if k != "keys"}
+            index = await collection.create_index(spec["keys"], **options)
+            logger.debug("Ensured index", extra={"collection": name, "index": index})
+
+
+async def count_by(collection, field: str, values: List) -> Dict[Any, int]:
+    """Number of documents per value of field, for each of values, in one aggregation"""
+    counts = dict.fromkeys(values, 0)
+    pipeline = [
+        {"$match": {field: {"$in": list(counts)}}},
+        {"$group": {"_id": f"${field}", "count": {"$sum": 1}}},
+    ]
+    async for row in collection.aggregate(pipeline):
+        counts[row["_id"]] = row["count"]
+    return counts
+
+
+class MongoDatabase:
+    """Attribute access to collections, each with its configured write concern
+
+    Collections without an entry in write_concerns inherit the client's
+    (acknowledged, w=1 unless the connection string says otherwise).
+    """
+
+    def __init__(self, database, write_concerns: Optional[Dict[str, WriteConcern]] = None):
+        self._database = database
+        self._write_concerns = write_concerns or {}
+
+    def __getattr__(self, name: str):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        collection = self._database.get_collection(name, write_concern=self._write_concerns.get(name))
+        # Cache so later lookups skip __getattr__ entirely
+        setattr(self, name, collection)
+        return collection
+
+    def reader(self, name: str, preference: str):
+        """The collection with a non-default read preference, e.g. for history reads"""
+        return self._database.get_collection(
+            name,
+            write_concern=self._write_concerns.get(name),
+            read_preference=read_preference(preference),
+        )
+
+
+class MongoCounters:
+    """Named counters stored as {_id: key, value: n} documents"""
+
+    # Counters are durable, so values never repeat across restarts
+    epoch = ""
+
+    def __init__(self, collection):
+        self._collection = collection
+
+    async def incr(self, key: str) -> int:
+        doc = await self._collection.find_one_and_update(
+            {"_id": key},
+            {"$inc": {"value": 1}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        return doc["value"]
+
+    async def get(self, key: str) -> int:
+        doc = await self._collection.find_one({"_id": key})
+        return doc["value"] if doc else 0
+
@@ -1,20 +1,40 @@
-from fastapi import FastAPI, APIRouter, HTTPException
-from dotenv import load_dotenv
+from fastapi import FastAPI, APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import JSONResponse
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
 import os
+import asyncio
 import logging
+import secrets
+import time
+from contextlib import asynccontextmanager
 from pathlib import Path
-from pydantic import BaseModel, Field, EmailStr
-from typing import List, Optional
-import uuid
-from datetime import datetime
-import httpx
+from pydantic import BaseModel, Field, EmailStr, TypeAdapter, ValidationError, model_validator
+from typing import Dict, List, Literal, NamedTuple, Optional, Union
+from datetime import datetime, timezone
 from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
-
+from in_memory_db import InMemoryDB
+from journal import Journal
+from sqlite_db import SQLiteDB
+from config_cache import VersionedCache
+from chat_queue import ChatJobQueue, MessageNotifier
+from log_pipeline import RequestIdMiddleware, request_id_var, setup_logging
+from webhook_pool import WebhookPool, parse_endpoints
+from http_cache import etag_matches, json_response, make_etag, not_modified, payload_etag
+from status_store import BUCKET_WIDTHS, StatusStore, bucket_start
+from static_files import StaticSite
+from ids import is_uuid7, new_id
+from intents import IntentMatcher
+from conversation_context import build_context
+from history_cache import HistoryCache
+
+
+# Heavy optional imports (motor, httpx, dotenv) are deferred until they are
+# actually needed, to keep cold starts short; see benchmarks/bench_startup.py
 
 ROOT_DIR = Path(__file__).parent
-load_dotenv(ROOT_DIR / '.env')
+if (ROOT_DIR / '.env').exists():
+    from dotenv import load_dotenv
+    load_dotenv(ROOT_DIR / '.env')
 
 # n8n configuration (read from environment)
 # If no DB-stored webhook is found, the server will fall back to this env var.
@@ -25,78 +45,164 @@ N8N_API_KEY = os.environ.get("N8N_API_KEY")
 N8N_API_KEY_HEADER_NAME = os.environ.get("N8N_API_KEY_HEADER_NAME", "X-N8N-API-KEY")
 # - If set, send API key as a query parameter with this name (takes precedence over header)
 N8N_API_KEY_QUERY_PARAM = os.environ.get("N8N_API_KEY_QUERY_PARAM")
+# Optional pool of webhook endpoints: "url;weight=2,url" (used when neither the
+# DB config nor N8N_WEBHOOK_URL names one)
+N8N_WEBHOOK_URLS = parse_endpoints(os.environ.get("N8N_WEBHOOK_URLS", ""))
+# How requests are spread across endpoints (see webhook_pool.py)
+webhook_pool = WebhookPool(
+    strategy=os.environ.get("N8N_BALANCE_STRATEGY", "least_outstanding"),
+    sticky=os.environ.get("N8N_STICKY_SESSIONS", "true").lower() == "true",
+    max_outstanding=int(os.environ.get("N8N_MAX_OUTSTANDING_PER_ENDPOINT", "0")),
+    eject_after=int(os.environ.get("N8N_EJECT_AFTER_FAILURES", "3")),
+    eject_seconds=float(os.environ.get("N8N_EJECT_SECONDS", "30")),
+)
 
-# Database configuration with in-memory fallback (for local/tests)
+# Database configuration: "mongo", "sqlite" or "memory" (default: mongo when
+# MONGO_URL is set, otherwise the in-memory fallback for local/tests)
 MONGO_URL = os.environ.get('MONGO_URL')
 DB_NAME = os.environ.get('DB_NAME', 'smokehouse')
-USE_IN_MEMORY_DB = os.environ.get('USE_IN_MEMORY_DB', '').lower() == 'true' or not MONGO_URL
+USE_IN_MEMORY_DB = os.environ.get('USE_IN_MEMORY_DB', '').lower() == 'true'
+DB_BACKEND = os.environ.get('DB_BACKEND', '').lower() or ('mongo' if MONGO_URL and not USE_IN_MEMORY_DB else 'memory')
+USE_IN_MEMORY_DB = DB_BACKEND == 'memory'
+SQLITE_PATH = os.environ.get('SQLITE_PATH', str(ROOT_DIR / 'smokehouse.db'))
+SQLITE_POOL_SIZE = int(os.environ.get('SQLITE_POOL_SIZE', '4'))
+# Mongo only: pool sizing/timeouts (MONGO_MAX_POOL_SIZE etc., see mongo_db.py),
+# per-collection write concerns, e.g. "chat_messages=1,n8n_config=majority",
+# and where chat history reads go (primary, secondaryPreferred, nearest, ...)
+MONGO_WRITE_CONCERNS = os.environ.get('MONGO_WRITE_CONCERNS', '')
+MONGO_HISTORY_READ_PREFERENCE = os.environ.get('MONGO_HISTORY_READ_PREFERENCE', 'primary')
 
 client = None
 
-if not USE_IN_MEMORY_DB:
-    client = AsyncIOMotorClient(MONGO_URL)
-    db = client[DB_NAME]
+if DB_BACKEND == 'mongo':
+    from motor.motor_asyncio import AsyncIOMotorClient
+    from mongo_db import MongoCounters, MongoDatabase, client_options, count_by, ensure_indexes, parse_write_concerns
+    client = AsyncIOMotorClient(MONGO_URL, **client_options(os.environ))
+    db = MongoDatabase(client[DB_NAME], parse_write_concerns(MONGO_WRITE_CONCERNS))
+    counters = MongoCounters(db.counters)
+    history_messages = db.reader('chat_messages', MONGO_HISTORY_READ_PREFERENCE)
+elif DB_BACKEND == 'sqlite':
+    db = SQLiteDB(SQLITE_PATH, pool_size=SQLITE_POOL_SIZE)
+    counters = db.counters
 else:
-    from typing import Any, Dict, Optional as OptDict
-
-    class InMemoryCursor:
-        def __init__(self, items):
-            self._items = list(items)
-
-        def sort(self, field: str, direction: int):
-            reverse = direction == -1
-            self._items.sort(key=lambda x: x.get(field), reverse=reverse)
-            return self
-
-        async def to_list(self, length: int):
-            return self._items[:length]
-
-    class InMemoryCollection:
-        def __init__(self):
-            self._items: list[Dict[str, Any]] = []
-
-        async def insert_one(self, doc: Dict[str, Any]):
-            self._items.append(dict(doc))
-            return None
-
-        async def find_one(self, filter: Dict[str, Any]):
-            for item in reversed(self._items):
-                if all(item.get(k) == v for k, v in filter.items()):
-                    return dict(item)
-            return None
-
-        def find(self, filter: OptDict[Dict[str, Any]] = None):
-            if not filter:
-                matched = list(self._items)
-            else:
-                matched = [i for i in self._items if all(i.get(k) == v for k, v in filter.items())]
-            return InMemoryCursor(matched)
-
-        async def delete_many(self, filter: Dict[str, Any]):
-            if not filter:
-                self._items.clear()
-                return None
-            self._items = [i for i in self._items if not all(i.get(k) == v for k, v in filter.items())]
-            return None
-
-    class InMemoryDB:
-        def __init__(self):
-            self.status_checks = InMemoryCollection()
-            self.chat_sessions = InMemoryCollection()
-            self.chat_messages = InMemoryCollection()
-            self.n8n_config = InMemoryCollection()
-
     db = InMemoryDB()
+    counters = db.counters
+
+if DB_BACKEND != 'mongo':
+    history_messages = db.chat_messages
+# Secondaries can lag behind the version counter, so history ETags are then
+# computed from the payload that was actually read
+HISTORY_FROM_SECONDARIES = DB_BACKEND == 'mongo' and MONGO_HISTORY_READ_PREFERENCE != 'primary'
+
+# Background chat processing: with CHAT_ASYNC_MODE, POST /api/chat/message
+# returns 202 and the webhook call runs on a pool of background workers.
+CHAT_ASYNC_MODE = os.environ.get('CHAT_ASYNC_MODE', '').lower() == 'true'
+CHAT_QUEUE_MAXSIZE = int(os.environ.get('CHAT_QUEUE_MAXSIZE', '1000'))
+CHAT_QUEUE_WORKERS = int(os.environ.get('CHAT_QUEUE_WORKERS', '8'))
+CHAT_JOB_DEADLINE = float(os.environ.get('CHAT_JOB_DEADLINE', '45'))
+LONG_POLL_TIMEOUT = float(os.environ.get('LONG_POLL_TIMEOUT', '25'))
+LONG_POLL_RECHECK_INTERVAL = float(os.environ.get('LONG_POLL_RECHECK_INTERVAL', '2'))
+
+# Shared secret for /api/admin routes, sent as X-Admin-Key (unset: no admin routes)
+ADMIN_API_KEY = os.environ.get('ADMIN_API_KEY')
+
+# History responses at least this large are gzip-compressed (0 disables)
+COMPRESS_MIN_BYTES = int(os.environ.get('COMPRESS_MIN_BYTES', '1024'))
+
+ERROR_REPLY = "I apologize, but I'm having trouble processing your request right now. Please try again later."
+NOT_CONFIGURED_REPLY = "The chatbot is not fully configured yet. Please contact the administrator to set up the n8n webhook URL."
+
+# Multi-worker mode: uvicorn reads WEB_CONCURRENCY as its default worker count.
+# Every worker is a separate process, so the in-memory store cannot be shared.
+WEB_CONCURRENCY = int(os.environ.get('WEB_CONCURRENCY', '1'))
+if WEB_CONCURRENCY > 1 and USE_IN_MEMORY_DB:
+    raise RuntimeError(
+        f"WEB_CONCURRENCY={WEB_CONCURRENCY} requires a shared store: set DB_BACKEND to 'mongo' or 'sqlite'"
+    )
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+# Status checks: the newest STATUS_RING_SIZE per client_name are kept in a
+# ring buffer with incremental per-minute/per-hour rollups. Every backend also
+# stores the checks (journaled on the memory backend), trimmed back to about
+# the ring size per client. Durable backends store the rollups as well, and
+# with several workers GET /api/status reads those stored rows (each worker's
+# ring only sees its own inserts).
+status_store = StatusStore(
+    ring_size=int(os.environ.get('STATUS_RING_SIZE', '1000')),
+    minute_buckets=int(os.environ.get('STATUS_MINUTE_BUCKETS', '1440')),
+    hour_buckets=int(os.environ.get('STATUS_HOUR_BUCKETS', '720')),
+    max_clients=int(os.environ.get('STATUS_MAX_CLIENTS', '10000')),
+)
+STATUS_DB_SCAN_LIMIT = int(os.environ.get('STATUS_DB_SCAN_LIMIT', '100000'))
+STORE_STATUS_ROLLUPS = not USE_IN_MEMORY_DB
+
+# Recent messages of active sessions, kept per worker and validated against
+# the shared session version counter (HISTORY_CACHE_MESSAGES=0 disables)
+history_cache = HistoryCache(
+    max_messages=int(os.environ.get('HISTORY_CACHE_MESSAGES', '50')),
+    max_sessions=int(os.environ.get('HISTORY_CACHE_SESSIONS', '10000')),
+    max_bytes=int(os.environ.get('HISTORY_CACHE_MAX_BYTES', str(64 * 2**20))),
+)
+# Optional conversation context in the webhook payload: up to N8N_CONTEXT_TURNS
+# earlier messages, taken from history_cache (see conversation_context.py)
+N8N_CONTEXT_TURNS = int(os.environ.get('N8N_CONTEXT_TURNS', '0'))
+N8N_CONTEXT_MAX_TOKENS = int(os.environ.get('N8N_CONTEXT_MAX_TOKENS', '0'))
+N8N_CONTEXT_MAX_CHARS = int(os.environ.get('N8N_CONTEXT_MAX_CHARS', '1000'))
+
+# Optional FAQ fast-path: messages that hit exactly one intent in INTENTS_FILE
+# (see intents.example.json) are answered locally instead of by n8n
+INTENTS_FILE = os.environ.get('INTENTS_FILE')
+intent_matcher = None
+if INTENTS_FILE:
+    intent_matcher = IntentMatcher(
+        INTENTS_FILE,
+        reload_interval=float(os.environ.get('INTENTS_RELOAD_INTERVAL', '2')),
+        max_message_length=int(os.environ.get('INTENTS_MAX_MESSAGE_LENGTH', '200')),
+    )
+
+# Optional: serve the built frontend (npm run build -> frontend/build) from
+# this process, with history-API fallback to index.html
+SERVE_FRONTEND = os.environ.get('SERVE_FRONTEND', '').lower() == 'true'
+frontend_site = None
+if SERVE_FRONTEND:
+    frontend_site = StaticSite(
+        os.environ.get('FRONTEND_BUILD_DIR', str(ROOT_DIR.parent / 'frontend' / 'build')),
+        compress_min_bytes=int(os.environ.get('FRONTEND_COMPRESS_MIN_BYTES', '1024')),
+    )
+
+# Optional durability for the in-memory DB: append-only journal + snapshots
+IN_MEMORY_JOURNAL_DIR = os.environ.get('IN_MEMORY_JOURNAL_DIR')
+journal = None
+if USE_IN_MEMORY_DB and IN_MEMORY_JOURNAL_DIR:
+    journal = Journal(
+        IN_MEMORY_JOURNAL_DIR,
+        flush_interval=float(os.environ.get('IN_MEMORY_JOURNAL_FLUSH_INTERVAL', '0.05')),
+        snapshot_every=int(os.environ.get('IN_MEMORY_SNAPSHOT_EVERY', '100000')),
+        fsync=os.environ.get('IN_MEMORY_JOURNAL_FSYNC', 'true').lower() == 'true',
+    )
+    journal.attach(db)
+
+# Configure logging: records are queued and written by a background thread
+# as JSON lines; LOG_SAMPLE_RATES thins out high-volume loggers, e.g.
+# "httpx=0.01,server=0.5"
+setup_logging(
+    level=os.environ.get('LOG_LEVEL', 'INFO'),
+    fmt=os.environ.get('LOG_FORMAT', 'json'),
+    queue_size=int(os.environ.get('LOG_QUEUE_SIZE', '10000')),
+    sample_rates=os.environ.get('LOG_SAMPLE_RATES', ''),
 )
 logger = logging.getLogger(__name__)
 
+# Startup/shutdown live in _startup()/_shutdown() at the end of this module
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await _startup()
+    try:
+        yield
+    finally:
+        await _shutdown()
+
 # Create the main app without a prefix
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -104,26 +210,40 @@ api_router = APIRouter(prefix="/api")
 
 # Define Models
 class StatusCheck(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=new_id)
     client_name: str
     timestamp: datetime = Field(default_factory=datetime.utcnow)
 
 class StatusCheckCreate(BaseModel):
     client_name: str
 
+class StatusRollup(BaseModel):
+    client_name: str
+    bucket: datetime
+    count: int
+    first_seen: datetime
+    last_seen: datetime
+
 # Chatbot Models
 class ChatSession(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=new_id)
     user_name: str
     user_email: EmailStr
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
+class ChatSessionSummary(ChatSession):
+    message_count: int = 0
+
+class ChatSessionPage(BaseModel):
+    sessions: List[ChatSessionSummary]
+    next_cursor: Optional[str] = None
+
 class ChatSessionCreate(BaseModel):
     user_name: str
     user_email: EmailStr
 
 class ChatMessage(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=new_id)
     session_id: str
     message: str
     sender: str  # "user" or "bot"
@@ -133,28 +253,155 @@ class ChatMessageSend(BaseModel):
     session_id: str
     message: str
 
+class ChatMessageAccepted(BaseModel):
+    message_id: str
+    status: str = "queued"
+
+class ChatJob(NamedTuple):
+    session: dict
+    session_id: str
+    message: str
+    request_id: Optional[str] = None
+    message_id: Optional[str] = None
+
+chat_message_list = TypeAdapter(List[ChatMessage])
+email_address = TypeAdapter(EmailStr)
+
+class WebhookEndpoint(BaseModel):
+    url: str
+    weight: float = Field(default=1.0, gt=0)
+
 class N8nConfig(BaseModel):
     webhook_url: Optional[str] = None
+    endpoints: List[WebhookEndpoint] = []
 
 class N8nConfigUpdate(BaseModel):
-    webhook_url: str
+    webhook_url: Optional[str] = None
+    endpoints: Optional[List[WebhookEndpoint]] = None
+
+    @model_validator(mode="after")
+    def require_endpoint(self):
+        if not self.webhook_url and not self.endpoints:
+            raise ValueError("Provide webhook_url or a non-empty endpoints list")
+        return self
+
+    def resolved_endpoints(self) -> List[WebhookEndpoint]:
+        return self.endpoints or [WebhookEndpoint(url=self.webhook_url)]
+
+# Webhook config is cached per worker; update_n8n_config bumps a shared
+# version counter so other workers reload it within CONFIG_REFRESH_INTERVAL.
+async def _load_n8n_config():
+    return await db.n8n_config.find_one({})
+
+n8n_config_cache = VersionedCache(
+    counters,
+    "n8n_config",
+    _load_n8n_config,
+    refresh_interval=float(os.environ.get('CONFIG_REFRESH_INTERVAL', '1.0')),
+)
+
+message_notifier = MessageNotifier()
+n8n_config_write_lock = asyncio.Lock()
 
 # Add your routes to the router instead of directly to app
 @api_router.get("/")
 async def root():
     return {"message": "Hello World"}
 
+@api_router.get("/ready")
+async def ready():
+    """Readiness: 503 until the startup warm-up (DB pool, webhook connections) is done"""
+    if warmup_seconds is None:
+        return JSONResponse(status_code=503, content={"status": "warming up"})
+    return {"status": "ready", "warmup_seconds": round(warmup_seconds, 3)}
+
 @api_router.post("/status", response_model=StatusCheck)
 async def create_status_check(input: StatusCheckCreate):
     status_dict = input.model_dump()
     status_obj = StatusCheck(**status_dict)
-    _ = await db.status_checks.insert_one(status_obj.model_dump())
+    doc = status_obj.model_dump()
+    await db.status_checks.insert_one(doc)
+    written = status_store.record(doc)
+    if STORE_STATUS_ROLLUPS:
+        await _store_status_rollups(doc)
+    # Once per ring's worth of this worker's checks, drop what the ring let go
+    if written % status_store.ring_size == 0:
+        await _trim_stored_status(doc["client_name"], doc["timestamp"])
     return status_obj
 
-@api_router.get("/status", response_model=List[StatusCheck])
-async def get_status_checks():
-    status_checks = await db.status_checks.find().to_list(1000)
-    return [StatusCheck(**status_check) for status_check in status_checks]
+async def _store_status_rollups(check: dict):
+    timestamp = check["timestamp"]
+    await asyncio.gather(*(
+        db.status_rollups.update_one(
+            {"client_name": check["client_name"], "granularity": granularity, "bucket": bucket_start(timestamp, granularity)},
+            {"$inc": {"count": 1}, "$min": {"first_seen": timestamp}, "$max": {"last_seen": timestamp}},
+            upsert=True,
+        )
+        for granularity in status_store.limits
+    ))
+
+async def _trim_stored_status(client_name: str, timestamp: datetime):
+    """Delete a client's stored checks older than its newest STATUS_RING_SIZE, and rollups past their retention"""
+    newest = await db.status_checks.find({"client_name": client_name}).sort("timestamp", -1).to_list(status_store.ring_size)
+    if len(newest) == status_store.ring_size:
+        await db.status_checks.delete_many({"client_name": client_name, "timestamp": {"$lt": newest[-1]["timestamp"]}})
+    if STORE_STATUS_ROLLUPS:
+        for granularity, limit in status_store.limits.items():
+            cutoff = bucket_start(timestamp, granularity) - limit * BUCKET_WIDTHS[granularity]
+            await db.status_rollups.delete_many(
+                {"client_name": client_name, "granularity": granularity, "bucket": {"$lt": cutoff}}
+            )
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Stored timestamps are naive UTC; convert aware query bounds to match"""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+def _status_query(client_name: Optional[str], field: str, since: Optional[datetime], until: Optional[datetime]):
+    query = {}
+    if client_name is not None:
+        query["client_name"] = client_name
+    window = {}
+    if since is not None:
+        window["$gte"] = since
+    if until is not None:
+        window["$lt"] = until
+    if window:
+        query[field] = window
+    return query
+
+async def _stored_status(granularity: str, client_name: Optional[str], since: Optional[datetime], until: Optional[datetime], limit: int):
+    """The newest `limit` stored checks or rollup buckets in range, oldest first (multi-worker reads)"""
+    if granularity == "raw":
+        query = _status_query(client_name, "timestamp", since, until)
+        rows = await db.status_checks.find(query).sort("timestamp", -1).to_list(limit)
+    else:
+        # Like StatusStore.rollup: buckets from the one holding `since`
+        floor = bucket_start(since, granularity) if since is not None else None
+        query = {"granularity": granularity, **_status_query(client_name, "bucket", floor, until)}
+        rows = await db.status_rollups.find(query).sort([("bucket", -1), ("client_name", -1)]).to_list(limit)
+    rows.reverse()
+    return rows
+
+@api_router.get("/status", response_model=Union[List[StatusCheck], List[StatusRollup]])
+async def get_status_checks(
+    client_name: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    granularity: Literal["raw", "minute", "hour"] = "raw",
+    limit: int = Query(1000, ge=1, le=10000),
+):
+    """Recent status checks oldest first, or per-minute/per-hour rollups of them"""
+    since, until = _naive_utc(since), _naive_utc(until)
+    if WEB_CONCURRENCY > 1:
+        rows = await _stored_status(granularity, client_name, since, until, limit)
+    elif granularity == "raw":
+        rows = status_store.raw(client_name, since, until, limit)
+    else:
+        rows = status_store.rollup(granularity, client_name, since, until, limit)
+    model = StatusCheck if granularity == "raw" else StatusRollup
+    return [model(**row) for row in rows]
 
 # Chatbot Routes
 @api_router.post("/chat/session", response_model=ChatSession)
@@ -162,126 +409,432 @@ async def create_chat_session(session_data: ChatSessionCreate):
     """Create a new chat session with user information"""
     session = ChatSession(**session_data.model_dump())
     await db.chat_sessions.insert_one(session.model_dump())
-    logger.info(f"Created chat session: {session.id}")
+    history_cache.start(session.id)
+    logger.info("Created chat session", extra={"session_id": session.id})
     return session
 
-@api_router.post("/chat/message", response_model=ChatMessage)
+def _webhook_request(webhook_url: str):
+    """Return the URL and headers to use, depending on how the API key is passed"""
+    request_headers = {}
+    url_to_post = webhook_url
+
+    if N8N_API_KEY and N8N_API_KEY_QUERY_PARAM:
+        # Append API key as query param
+        parts = urlsplit(url_to_post)
+        query_params = dict(parse_qsl(parts.query))
+        query_params[N8N_API_KEY_QUERY_PARAM] = N8N_API_KEY
+        new_query = urlencode(query_params, doseq=True)
+        url_to_post = urlunsplit((parts.scheme, parts.netloc, parts.path, new_query, parts.fragment))
+    elif N8N_API_KEY:
+        # Send API key in header (default)
+        request_headers[N8N_API_KEY_HEADER_NAME] = N8N_API_KEY
+
+    return url_to_post, request_headers
+
+def _endpoints_from(config: Optional[dict]) -> List[WebhookEndpoint]:
+    """Webhook endpoints from a stored config doc, falling back to env vars"""
+    if config and config.get("endpoints"):
+        return [WebhookEndpoint(**e) for e in config["endpoints"]]
+    if config and config.get("webhook_url"):
+        return [WebhookEndpoint(url=config["webhook_url"])]
+    if N8N_WEBHOOK_URL:
+        return [WebhookEndpoint(url=N8N_WEBHOOK_URL)]
+    return [WebhookEndpoint(url=url, weight=weight) for url, weight in N8N_WEBHOOK_URLS]
+
+_http_client = None
+
+def _get_http_client():
+    """Shared webhook client (imports httpx on first use); keeps connections alive between calls"""
+    global _http_client
+    if _http_client is None:
+        import httpx
+        _http_client = httpx.AsyncClient(timeout=30.0)
+    return _http_client
+
+async def _conversation_context(session_id: str, message_id: Optional[str]) -> List[dict]:
+    """The turns before message_id for the webhook payload
+
+    Served from history_cache, which every stored message already updates;
+    the database is only read when this worker's entry is missing or stale.
+    """
+    version = await counters.get(_session_version_key(session_id))
+    limit = N8N_CONTEXT_TURNS + 1
+    messages = history_cache.get(session_id, version, limit)
+    if messages is None:
+        messages = await _read_history(session_id, limit)
+        if not HISTORY_FROM_SECONDARIES:
+            history_cache.fill(session_id, version, messages, complete=len(messages) < limit)
+    if message_id is not None and all(m.id != message_id for m in messages):
+        # More messages were stored behind message_id than the window holds
+        # (e.g. while its job was queued): read the turns right before it
+        messages = await _read_history(session_id, N8N_CONTEXT_TURNS, before=message_id)
+    return build_context(
+        messages,
+        message_id,
+        N8N_CONTEXT_TURNS,
+        max_tokens=N8N_CONTEXT_MAX_TOKENS,
+        max_chars=N8N_CONTEXT_MAX_CHARS,
+    )
+
+async def _call_n8n(session: dict, session_id: str, message: str, message_id: Optional[str] = None) -> str:
+    """Send a message to the n8n workflow and return the bot reply text
+
+    With N8N_CONTEXT_TURNS the payload also carries "context", the bounded
+    window of messages stored before message_id (the user message).
+    """
+    import httpx
+    # Get n8n webhook endpoints (check database first, then fall back to env vars)
+    config = await n8n_config_cache.get()
+    webhook_pool.configure((e.url, e.weight) for e in _endpoints_from(config))
+    endpoint = webhook_pool.pick(session_id)
+
+    if endpoint is None:
+        # No webhook configured - return default message
+        return NOT_CONFIGURED_REPLY
+
+    payload = {
+        "session_id": session_id,
+        "user_name": session.get("user_name"),
+        "user_email": session.get("user_email"),
+        "message": message,
+        "timestamp": datetime.utcnow().isoformat()
+    }
+    if N8N_CONTEXT_TURNS > 0:
+        payload["context"] = await _conversation_context(session_id, message_id)
+
+    webhook_url = endpoint.url
+    started = webhook_pool.acquire(endpoint)
+    ok = False
+    try:
+        # Send to n8n workflow over the shared, pre-warmed connection pool
+        http_client = _get_http_client()
+        url_to_post, request_headers = _webhook_request(webhook_url)
+        response = await http_client.post(url_to_post, json=payload, headers=request_headers or None)
+        # 4xx is a request problem, not an unhealthy endpoint
+        ok = response.status_code < 500
+        response.raise_for_status()
+
+        # Parse n8n response (support JSON or plain text)
+        try:
+            n8n_response = response.json()
+            return (
+                n8n_response.get("response")
+                or n8n_response.get("message")
+                or str(n8n_response)
+            )
+        except ValueError:
+            # Not JSON; use raw text
+            return response.text.strip() or "(no response)"
+
+    except httpx.HTTPError as e:
+        logger.error("Error calling n8n webhook", extra={"session_id": session_id, "error": str(e)})
+        return ERROR_REPLY
+    except Exception as e:
+        logger.error("Unexpected error with n8n", extra={"session_id": session_id, "error": repr(e)})
+        return ERROR_REPLY
+    finally:
+        webhook_pool.release(endpoint, started, ok)
+
+def _history_query(session_id: str, after: Optional[str] = None, before: Optional[str] = None):
+    """Filter and sort key for a session's history, oldest first
+
+    Sessions created with time-ordered (UUIDv7) ids have time-ordered message
+    ids too, so history is sorted and paged by id alone; sessions from before
+    that keep sorting by timestamp.
+    """
+    query = {"session_id": session_id}
+    if not is_uuid7(session_id):
+        return query, "timestamp"
+    if is_uuid7(after):
+        query["id"] = {"$gt": after}
+    if is_uuid7(before):
+        query.setdefault("id", {})["$lt"] = before
+    return query, "id"
+
+async def _read_history(
+    session_id: str, limit: Optional[int] = None, before: Optional[str] = None
+) -> List[ChatMessage]:
+    """The newest `limit` messages of a session from the store (the first 1000 when None), oldest first
+
+    With `before` (a message id), only the messages stored before that one.
+    """
+    query, sort_key = _history_query(session_id, before=before)
+    if before is not None and "id" not in query:
+        # Sorted by timestamp: bound by the timestamp of `before` instead
+        message = await db.chat_messages.find_one({"id": before})
+        if message is None:
+            return []
+        query["timestamp"] = {"$lt": message["timestamp"]}
+    if limit is None:
+        rows = await history_messages.find(query).sort(sort_key, 1).to_list(1000)
+    else:
+        rows = (await history_messages.find(query).sort(sort_key, -1).to_list(limit))[::-1]
+    return [ChatMessage(**row) for row in rows]
+
+def _session_version_key(session_id: str) -> str:
+    return f"session:{session_id}"
+
+async def _store_message(session_id: str, text: str, sender: str) -> ChatMessage:
+    message = ChatMessage(session_id=session_id, message=text, sender=sender)
+    await db.chat_messages.insert_one(message.model_dump())
+    # Bump after the insert so a reader never pairs the new version with old rows
+    version = await counters.incr(_session_version_key(session_id))
+    history_cache.append(session_id, message, version)
+    message_notifier.notify(session_id)
+    return message
+
+async def _process_chat_job(job: ChatJob):
+    # Keep the originating request id on logs emitted by the worker
+    request_id_var.set(job.request_id)
+    reply = await _call_n8n(job.session, job.session_id, job.message, job.message_id)
+    await _store_message(job.session_id, reply, "bot")
+
+async def _chat_job_timed_out(job: ChatJob):
+    await _store_message(job.session_id, ERROR_REPLY, "bot")
+
+chat_queue = ChatJobQueue(
+    _process_chat_job,
+    _chat_job_timed_out,
+    maxsize=CHAT_QUEUE_MAXSIZE,
+    workers=CHAT_QUEUE_WORKERS,
+    deadline=CHAT_JOB_DEADLINE,
+)
+
+@api_router.post(
+    "/chat/message",
+    response_model=ChatMessage,
+    responses={202: {"model": ChatMessageAccepted}},
+)
 async def send_chat_message(message_data: ChatMessageSend):
-    """Send a message to n8n workflow and return the response"""
+    """Send a message to n8n workflow and return the response
+
+    With CHAT_ASYNC_MODE the webhook call is queued instead: the response is
+    202 with the user message id, and the reply arrives via /chat/messages/{session_id}/wait.
+    """
     # Verify session exists
     session = await db.chat_sessions.find_one({"id": message_data.session_id})
     if not session:
         raise HTTPException(status_code=404, detail="Chat session not found")
-    
-    # Save user message
-    user_message = ChatMessage(
-        session_id=message_data.session_id,
-        message=message_data.message,
-        sender="user"
-    )
-    await db.chat_messages.insert_one(user_message.model_dump())
 
-    # Get n8n webhook URL (check database first, then fall back to env var)
-    config = await db.n8n_config.find_one({})
-    webhook_url = (config.get("webhook_url") if (config and config.get("webhook_url")) else N8N_WEBHOOK_URL)
+    if CHAT_ASYNC_MODE and chat_queue.full():
+        raise HTTPException(status_code=503, detail="Chat is busy, please try again shortly")
 
-    bot_response_text = ""
-    
-    if webhook_url:
+    # Save user message
+    user_message = await _store_message(message_data.session_id, message_data.message, "user")
+
+    intent = intent_matcher.match(message_data.message) if intent_matcher is not None else None
+    if intent is not None:
+        logger.info("Answered from intent", extra={"session_id": message_data.session_id, "intent": intent.name})
+        bot_message = await _store_message(message_data.session_id, intent.response, "bot")
+        if not CHAT_ASYNC_MODE:
+            return bot_message
+        # Keep the async contract: the reply is already there for /wait
+        accepted = ChatMessageAccepted(message_id=user_message.id, status="answered")
+        return JSONResponse(status_code=202, content=accepted.model_dump())
+
+    if CHAT_ASYNC_MODE:
         try:
-            # Send to n8n workflow
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                # Build URL and headers depending on how the API key should be passed
-                request_headers = {}
-                url_to_post = webhook_url
-
-                if N8N_API_KEY and N8N_API_KEY_QUERY_PARAM:
-                    # Append API key as query param
-                    parts = urlsplit(url_to_post)
-                    query_params = dict(parse_qsl(parts.query))
-                    query_params[N8N_API_KEY_QUERY_PARAM] = N8N_API_KEY
-                    new_query = urlencode(query_params, doseq=True)
-                    url_to_post = urlunsplit((parts.scheme, parts.netloc, parts.path, new_query, parts.fragment))
-                elif N8N_API_KEY:
-                    # Send API key in header (default)
-                    request_headers[N8N_API_KEY_HEADER_NAME] = N8N_API_KEY
-
-                response = await client.post(
-                    url_to_post,
-                    json={
-                        "session_id": message_data.session_id,
-                        "user_name": session.get("user_name"),
-                        "user_email": session.get("user_email"),
-                        "message": message_data.message,
-                        "timestamp": datetime.utcnow().isoformat()
-                    },
-                    headers=request_headers or None
-                )
-                response.raise_for_status()
-
-                # Parse n8n response (support JSON or plain text)
-                try:
-                    n8n_response = response.json()
-                    bot_response_text = (
-                        n8n_response.get("response")
-                        or n8n_response.get("message")
-                        or str(n8n_response)
-                    )
-                except ValueError:
-                    # Not JSON; use raw text
-                    bot_response_text = response.text.strip() or "(no response)"
-                
-        except httpx.HTTPError as e:
-            logger.error(f"Error calling n8n webhook: {e}")
-            bot_response_text = "I apologize, but I'm having trouble processing your request right now. Please try again later."
-        except Exception as e:
-            logger.error(f"Unexpected error with n8n: {e}")
-            bot_response_text = "I apologize, but I'm having trouble processing your request right now. Please try again later."
-    else:
-        # No webhook configured - return default message
-        bot_response_text = "The chatbot is not fully configured yet. Please contact the administrator to set up the n8n webhook URL."
-    
-    # Save bot response
-    bot_message = ChatMessage(
-        session_id=message_data.session_id,
-        message=bot_response_text,
-        sender="bot"
-    )
-    await db.chat_messages.insert_one(bot_message.model_dump())
+            chat_queue.submit(ChatJob(
+                session, message_data.session_id, message_data.message, request_id_var.get(), user_message.id
+            ))
+        except asyncio.QueueFull:
+            raise HTTPException(status_code=503, detail="Chat is busy, please try again shortly")
+        accepted = ChatMessageAccepted(message_id=user_message.id)
+        return JSONResponse(status_code=202, content=accepted.model_dump())
+
+    bot_response_text = await _call_n8n(session, message_data.session_id, message_data.message, user_message.id)
 
-    return bot_message
+    # Save bot response
+    return await _store_message(message_data.session_id, bot_response_text, "bot")
 
 @api_router.get("/chat/messages/{session_id}", response_model=List[ChatMessage])
-async def get_chat_messages(session_id: str):
-    """Get all messages for a chat session"""
-    messages = await db.chat_messages.find({"session_id": session_id}).sort("timestamp", 1).to_list(1000)
-    return [ChatMessage(**msg) for msg in messages]
+async def get_chat_messages(
+    session_id: str,
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+):
+    """Get the messages of a chat session, oldest first (only the newest `limit` if given)
+
+    Answers 304 when If-None-Match carries the session's current ETag, which
+    is derived from its message version counter without reading messages
+    (or, when history is read from Mongo secondaries, hashed from the payload).
+    Recent history is usually served from history_cache without a DB read.
+    """
+    version = await counters.get(_session_version_key(session_id))
+    etag = None
+    if not HISTORY_FROM_SECONDARIES:
+        etag = make_etag(counters.epoch, version, limit or "")
+        if etag_matches(request, etag):
+            return not_modified(etag)
+    messages = history_cache.get(session_id, version, limit)
+    if messages is None:
+        messages = await _read_history(session_id, limit)
+        # A lagging secondary could pair old rows with the current version, and
+        # a full read that hit the cap holds the oldest messages, not the newest
+        if not HISTORY_FROM_SECONDARIES and (limit is not None or len(messages) < 1000):
+            history_cache.fill(session_id, version, messages, complete=len(messages) < (limit or 1000))
+    body = chat_message_list.dump_json(messages)
+    if etag is None:
+        etag = payload_etag(body)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+    return json_response(request, body, etag, compress_min_bytes=COMPRESS_MIN_BYTES)
+
+@api_router.get("/chat/messages/{session_id}/wait", response_model=List[ChatMessage])
+async def wait_for_chat_messages(
+    session_id: str,
+    request: Request,
+    after: Optional[str] = None,
+    timeout: float = Query(LONG_POLL_TIMEOUT, ge=0, le=LONG_POLL_TIMEOUT),
+):
+    """Long-poll for messages newer than the message id `after`
+
+    Returns as soon as there is at least one newer message, or an empty list
+    once `timeout` seconds pass without one.
+    """
+    deadline = time.monotonic() + timeout
+    version_key = _session_version_key(session_id)
+    seen_version = None
+    while True:
+        # Only re-read the history when the session's version moved
+        version = await counters.get(version_key)
+        if version != seen_version:
+            seen_version = version
+            query, sort_key = _history_query(session_id, after)
+            messages = await db.chat_messages.find(query).sort(sort_key, 1).to_list(1000)
+            if after is not None and "id" not in query:
+                ids = [msg["id"] for msg in messages]
+                if after in ids:
+                    messages = messages[ids.index(after) + 1:]
+            if messages:
+                body = chat_message_list.dump_json([ChatMessage(**msg) for msg in messages])
+                return json_response(request, body, compress_min_bytes=COMPRESS_MIN_BYTES)
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return []
+        # Replies stored by another worker do not notify this one, so
+        # re-check the store periodically as well.
+        await message_notifier.wait(session_id, min(remaining, LONG_POLL_RECHECK_INTERVAL))
+
+@api_router.get("/chat/intents/stats")
+async def get_intent_stats():
+    """How many messages the intent fast-path answered vs passed to n8n (this worker)"""
+    if intent_matcher is None:
+        return {"enabled": False}
+    return {"enabled": True, "worker_pid": os.getpid(), **intent_matcher.stats()}
 
 @api_router.get("/chat/config", response_model=N8nConfig)
-async def get_n8n_config():
+async def get_n8n_config(request: Request):
     """Get the current n8n webhook configuration"""
     # Check environment variable first
     webhook_url = os.environ.get('N8N_WEBHOOK_URL')
     if webhook_url:
-        return N8nConfig(webhook_url=webhook_url)
+        endpoints = [WebhookEndpoint(url=webhook_url)]
+    else:
+        # Fall back to database
+        endpoints = _endpoints_from(await n8n_config_cache.get())
+    config = N8nConfig(webhook_url=endpoints[0].url if endpoints else None, endpoints=endpoints)
 
-    # Fall back to database
-    config = await db.n8n_config.find_one({})
-    if config and config.get("webhook_url"):
-        return N8nConfig(webhook_url=config.get("webhook_url"))
-    return N8nConfig(webhook_url=N8N_WEBHOOK_URL)
+    # The payload is tiny and already cached, so hash it for the ETag
+    body = config.model_dump_json().encode()
+    etag = payload_etag(body)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return json_response(request, body, etag)
 
 @api_router.put("/chat/config")
 async def update_n8n_config(config_data: N8nConfigUpdate):
-    """Update the n8n webhook URL"""
-    # Delete existing config and insert new one
-    await db.n8n_config.delete_many({})
-    await db.n8n_config.insert_one({"webhook_url": config_data.webhook_url})
-    logger.info("Updated n8n webhook URL")
-    return {"message": "Configuration updated successfully", "webhook_url": config_data.webhook_url}
+    """Update the n8n webhook URL, or a weighted pool of webhook endpoints"""
+    endpoints = [e.model_dump() for e in config_data.resolved_endpoints()]
+    webhook_url = endpoints[0]["url"]
+    # Delete existing config and insert new one; serialize updates so two
+    # concurrent requests cannot interleave and leave zero or two configs
+    async with n8n_config_write_lock:
+        await db.n8n_config.delete_many({})
+        await db.n8n_config.insert_one({"webhook_url": webhook_url, "endpoints": endpoints})
+        await n8n_config_cache.bump()
+    logger.info("Updated n8n webhook URL", extra={"endpoints": len(endpoints)})
+    return {"message": "Configuration updated successfully", "webhook_url": webhook_url, "endpoints": endpoints}
+
+# Admin Routes
+async def _message_counts(session_ids: List[str]) -> Dict[str, int]:
+    """Stored messages per session, in one grouped count"""
+    if DB_BACKEND == 'mongo':
+        return await count_by(db.chat_messages, "session_id", session_ids)
+    return await db.chat_messages.count_by("session_id", session_ids)
+
+def require_admin(x_admin_key: Optional[str] = Header(None)):
+    """Admin routes need ADMIN_API_KEY in the X-Admin-Key header, and are hidden while it is unset"""
+    if not ADMIN_API_KEY:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not (x_admin_key and secrets.compare_digest(x_admin_key.encode(), ADMIN_API_KEY.encode())):
+        raise HTTPException(status_code=401, detail="Invalid admin key")
+
+def _session_cursor(session: dict) -> str:
+    return f"{session['created_at'].isoformat()}_{session['id']}"
+
+def _parse_session_cursor(cursor: str):
+    created_at, _, session_id = cursor.partition("_")
+    try:
+        return _naive_utc(datetime.fromisoformat(created_at)), session_id
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def _normalize_email(email: str) -> str:
+    """Stored addresses went through EmailStr, which lower-cases the domain"""
+    try:
+        return email_address.validate_python(email)
+    except ValidationError:
+        raise HTTPException(status_code=400, detail="Invalid email")
+
+@api_router.get("/admin/sessions", response_model=ChatSessionPage, dependencies=[Depends(require_admin)])
+async def list_chat_sessions(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    email: Optional[str] = None,
+    email_prefix: Optional[str] = Query(None, min_length=1),
+):
+    """List chat sessions newest first, optionally by exact email or email prefix
+
+    Keyset-paginated on (created_at, id), so sessions with older uuid4 ids
+    take their place by creation time: pass next_cursor back as cursor for
+    the following page. message_count counts the stored messages.
+    """
+    if email and email_prefix:
+        raise HTTPException(status_code=400, detail="Use either email or email_prefix")
+    query = {}
+    if email:
+        query["user_email"] = _normalize_email(email)
+    elif email_prefix:
+        local, at, domain = email_prefix.partition("@")
+        email_prefix = local + at + domain.lower()
+        # Prefix match as a range, so every backend can answer it from an index
+        query["user_email"] = {"$gte": email_prefix, "$lt": email_prefix + "\U0010ffff"}
+    rows = []
+    if cursor:
+        created_at, last_id = _parse_session_cursor(cursor)
+        # Sessions created in the same instant as the cursor's come first
+        rows = await db.chat_sessions.find(
+            {**query, "created_at": created_at, "id": {"$lt": last_id}}
+        ).sort("id", -1).to_list(limit + 1)
+        query["created_at"] = {"$lt": created_at}
+    if len(rows) <= limit:
+        rows += await db.chat_sessions.find(query).sort(
+            [("created_at", -1), ("id", -1)]
+        ).to_list(limit + 1 - len(rows))
+    page = rows[:limit]
+    counts = await _message_counts([row["id"] for row in page])
+    return ChatSessionPage(
+        sessions=[ChatSessionSummary(**row, message_count=counts[row["id"]]) for row in page],
+        next_cursor=_session_cursor(page[-1]) if len(rows) > limit else None,
+    )
 
 # Include the router in the main app
 app.include_router(api_router)
+# Mounted last so every /api route matches first
+if frontend_site is not None:
+    app.mount("/", frontend_site, name="frontend")
 
 app.add_middleware(
     CORSMiddleware,
@@ -289,9 +842,107 @@ app.add_middleware(
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Request-ID"],
 )
-
-@app.on_event("shutdown")
-async def shutdown_db_client():
+app.add_middleware(RequestIdMiddleware)
+
+# Startup warm-up: runs in the background so the process answers /api/ at
+# once, while /api/ready stays 503 until the first chat request would no
+# longer pay for DNS, TLS and DB connection setup.
+WARMUP_TIMEOUT = float(os.environ.get('WARMUP_TIMEOUT', '10'))
+WARMUP_DB_CONNECTIONS = int(os.environ.get('WARMUP_DB_CONNECTIONS', '4'))
+warmup_seconds: Optional[float] = None
+_warmup_task: Optional[asyncio.Task] = None
+
+async def _ensure_mongo_indexes():
+    try:
+        await ensure_indexes(db)
+    except Exception as e:
+        # Queries still work without them, only slower
+        logger.warning("Could not create Mongo indexes", extra={"error": repr(e)})
+
+async def _warm_db():
+    if DB_BACKEND == 'mongo':
+        # Concurrent pings check out (and so open) several pool connections
+        await asyncio.gather(
+            _ensure_mongo_indexes(),
+            *(client.admin.command('ping') for _ in range(WARMUP_DB_CONNECTIONS)),
+        )
+    # Also loads the webhook config into its cache
+    return await n8n_config_cache.get()
+
+async def _warm_webhooks(config):
+    """Resolve and connect to every configured webhook origin"""
+    origins = {}
+    for endpoint in _endpoints_from(config):
+        parts = urlsplit(endpoint.url)
+        if parts.hostname:
+            origins[f"{parts.scheme}://{parts.netloc}"] = parts
+    http_client = _get_http_client()
+    loop = asyncio.get_running_loop()
+
+    async def warm(origin, parts):
+        try:
+            port = parts.port or (443 if parts.scheme == 'https' else 80)
+            await loop.getaddrinfo(parts.hostname, port)
+            # Any response leaves a live (TLS) connection in the client's pool
+            await http_client.head(origin)
+        except Exception as e:
+            logger.warning("Webhook warm-up failed", extra={"origin": origin, "error": repr(e)})
+
+    await asyncio.gather(*(warm(origin, parts) for origin, parts in origins.items()))
+
+async def _warm_up(started: float):
+    global warmup_seconds
+    try:
+        config = await asyncio.wait_for(_warm_db(), WARMUP_TIMEOUT)
+        await asyncio.wait_for(_warm_webhooks(config), WARMUP_TIMEOUT)
+    except Exception as e:
+        # Serve anyway: a slow dependency should not keep the worker out of rotation forever
+        logger.warning("Warm-up incomplete", extra={"error": repr(e)})
+    warmup_seconds = time.perf_counter() - started
+    logger.info("Warm-up finished", extra={"seconds": round(warmup_seconds, 3)})
+
+async def _startup():
+    global _warmup_task
+    started = time.perf_counter()
+    if journal is not None:
+        journal.load()
+        # Counters are not journaled: rebuild the session message versions from
+        # the restored messages, so versions keep growing across restarts
+        # instead of starting over at zero for sessions that have history
+        counters.load({
+            _session_version_key(session_id): count
+            for session_id, count in db.chat_messages.value_counts('session_id').items()
+            if session_id is not None
+        })
+        await journal.start()
+    # Refill the status rings from stored checks (durable backends, or rows
+    # restored from the in-memory journal); stored rollups outlive the rings
+    rows = await db.status_checks.find().sort("timestamp", -1).to_list(STATUS_DB_SCAN_LIMIT)
+    rollups = None
+    if STORE_STATUS_ROLLUPS:
+        rollups = await db.status_rollups.find().sort("bucket", -1).to_list(STATUS_DB_SCAN_LIMIT)
+    # No stored rollups yet (e.g. data from before they existed): rebuild from the checks
+    status_store.load(rows, rollups or None)
+    if frontend_site is not None:
+        await asyncio.to_thread(frontend_site.load)
+    if CHAT_ASYNC_MODE:
+        await chat_queue.start()
+    _warmup_task = asyncio.create_task(_warm_up(started))
+
+async def _shutdown():
+    global _http_client
+    if _warmup_task is not None and not _warmup_task.done():
+        _warmup_task.cancel()
+    if CHAT_ASYNC_MODE:
+        await chat_queue.stop()
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+    if journal is not None:
+        await journal.stop()
     if client is not None:
         client.close()
+    if DB_BACKEND == 'sqlite':
+        db.close()
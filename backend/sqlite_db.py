@@ -0,0 +1,326 @@
+"""
+SQLite storage backend implementing the collection interface used by server.py.
+
+Durable, needs no external service, and can be shared by several uvicorn
+workers on the same host: the database runs in WAL mode so readers never
+block the single writer.
+
+Each collection is a table holding the full document as JSON plus a few
+projected, indexed columns used for filtering and sorting. Queries run on a
+small pool of connections in worker threads so the event loop never blocks
+on disk I/O.
+"""
+import asyncio
+import queue
+import sqlite3
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from in_memory_db import is_operator, sort_keys
+from journal import dumps, loads
+
+# Projected columns and indexes per collection. Fields not listed here are
+# still stored (in the JSON document) and filtered with json_extract().
+TABLES: Dict[str, Dict[str, List]] = {
+    "status_checks": {
+        "columns": ["id", "client_name", "timestamp"],
+        "indexes": [["id"], ["client_name", "timestamp"], ["timestamp"]],
+    },
+    "status_rollups": {
+        "columns": ["client_name", "granularity", "bucket"],
+        "indexes": [["client_name", "granularity", "bucket"], ["granularity", "bucket"]],
+    },
+    "chat_sessions": {
+        "columns": ["id", "created_at", "user_email"],
+        "indexes": [["id"], ["created_at", "id"], ["user_email", "created_at", "id"]],
+    },
+    "chat_messages": {
+        "columns": ["id", "session_id", "timestamp"],
+        "indexes": [["id"], ["session_id", "timestamp"], ["session_id", "id"]],
+    },
+    "n8n_config": {
+        "columns": [],
+        "indexes": [],
+    },
+}
+
+_EPOCH = datetime(1970, 1, 1)
+
+SQL_OPERATORS = {"$gt": ">", "$gte": ">=", "$lt": "<", "$lte": "<=", "$ne": "IS NOT"}
+
+UPDATE_OPERATORS = {
+    "$set": lambda current, value: value,
+    "$inc": lambda current, value: value if current is None else current + value,
+    "$min": lambda current, value: value if current is None else min(current, value),
+    "$max": lambda current, value: value if current is None else max(current, value),
+}
+
+
+def _to_sql(value: Any):
+    """Encode a value for a projected column (datetimes sort as int64 micros)"""
+    if isinstance(value, datetime) and value.tzinfo is None:
+        return (value - _EPOCH) // timedelta(microseconds=1)
+    return value
+
+
+def _to_json_value(value: Any):
+    """Encode a value the way json_extract() returns it from the stored document"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _apply_update(doc: Dict[str, Any], update: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """A copy of doc with update ({"$inc": {field: n}, ...}) applied"""
+    doc = dict(doc)
+    for op, fields in update.items():
+        if op not in UPDATE_OPERATORS:
+            raise ValueError(f"Unsupported update operator: {op}")
+        for field, value in fields.items():
+            doc[field] = UPDATE_OPERATORS[op](doc.get(field), value)
+    return doc
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False, cached_statements=256)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=5000")
+    return conn
+
+
+class _ConnectionPool:
+    """Fixed set of connections handed out to worker threads"""
+
+    def __init__(self, path: str, size: int):
+        self._connections: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        self._all = [_connect(path) for _ in range(size)]
+        for conn in self._all:
+            self._connections.put(conn)
+
+    def run(self, sql: str, params: Tuple = (), fetch: bool = False):
+        conn = self._connections.get()
+        try:
+            cursor = conn.execute(sql, params)
+            return cursor.fetchall() if fetch else None
+        finally:
+            self._connections.put(conn)
+
+    def transaction(self, work: Callable[[sqlite3.Connection], Any]):
+        """Run work(conn) in a write transaction, taking the write lock up front"""
+        conn = self._connections.get()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = work(conn)
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+            return result
+        finally:
+            self._connections.put(conn)
+
+    def close(self):
+        for conn in self._all:
+            conn.close()
+
+
+class SQLiteCursor:
+    def __init__(self, collection: "SQLiteCollection", filter: Optional[Dict[str, Any]]):
+        self._collection = collection
+        self._filter = filter or {}
+        self._sort: Optional[Tuple[Tuple[str, int], ...]] = None
+
+    def sort(self, key, direction: Optional[int] = None):
+        # A tuple, so the statement cache can key on it
+        self._sort = tuple(sort_keys(key, direction))
+        return self
+
+    async def to_list(self, length: int):
+        return await self._collection._select(self._filter, self._sort, length)
+
+
+class SQLiteCollection:
+    def __init__(self, name: str, pool: _ConnectionPool):
+        self.name = name
+        self._pool = pool
+        self._columns = TABLES[name]["columns"]
+        columns = ["doc"] + self._columns
+        self._insert_sql = f"INSERT INTO {name} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+        self._update_sql = f"UPDATE {name} SET {', '.join(f'{c} = ?' for c in columns)} WHERE seq = ?"
+
+    def _expr(self, field: str) -> str:
+        if field in self._columns:
+            return field
+        return f"json_extract(doc, '$.{field}')"
+
+    @staticmethod
+    def _shape(filter: Dict[str, Any]) -> Tuple:
+        """Hashable description of a filter's structure (not its values)"""
+        shape = []
+        for key, value in filter.items():
+            if is_operator(value):
+                shape.append((key, tuple((op, len(v) if op == "$in" else 0) for op, v in value.items())))
+            else:
+                shape.append((key, None))
+        return tuple(shape)
+
+    def _where(self, shape: Tuple) -> str:
+        clauses = []
+        for key, ops in shape:
+            expr = self._expr(key)
+            if ops is None:
+                clauses.append(f"{expr} = ?")
+                continue
+            for op, size in ops:
+                if op == "$in":
+                    clauses.append(f"{expr} IN ({', '.join('?' * size)})" if size else "0")
+                elif op in SQL_OPERATORS:
+                    clauses.append(f"{expr} {SQL_OPERATORS[op]} ?")
+                else:
+                    raise ValueError(f"Unsupported query operator: {op}")
+        return " AND ".join(clauses) or "1"
+
+    @lru_cache(maxsize=256)
+    def _sql(self, kind: str, shape: Tuple, sort: Optional[Tuple[Tuple[str, int], ...]] = None) -> str:
+        """Build (and memoize) the statement text so sqlite3 reuses its prepared statement"""
+        where = self._where(shape)
+        if kind == "delete":
+            return f"DELETE FROM {self.name} WHERE {where}"
+        if kind == "find_one":
+            return f"SELECT doc FROM {self.name} WHERE {where} ORDER BY seq DESC LIMIT 1"
+        if kind == "update":
+            return f"SELECT seq, doc FROM {self.name} WHERE {where} ORDER BY seq DESC LIMIT 1"
+        if kind == "count_by":
+            # Grouped by the single filtered field
+            expr = self._expr(shape[0][0])
+            return f"SELECT {expr}, COUNT(*) FROM {self.name} WHERE {where} GROUP BY {expr}"
+        order = "".join(f"{self._expr(field)} {'DESC' if direction == -1 else 'ASC'}, " for field, direction in sort or ())
+        order += "seq"
+        return f"SELECT doc FROM {self.name} WHERE {where} ORDER BY {order} LIMIT ?"
+
+    def _params(self, filter: Dict[str, Any]) -> Tuple:
+        params = []
+        for key, value in filter.items():
+            encode = _to_sql if key in self._columns else _to_json_value
+            if not is_operator(value):
+                params.append(encode(value))
+                continue
+            for op, operand in value.items():
+                if op == "$in":
+                    params.extend(encode(v) for v in operand)
+                else:
+                    params.append(encode(operand))
+        return tuple(params)
+
+    async def _select(self, filter: Dict[str, Any], sort: Optional[Tuple[Tuple[str, int], ...]], length: int):
+        sql = self._sql("find", self._shape(filter), sort)
+        rows = await asyncio.to_thread(self._pool.run, sql, self._params(filter) + (length,), True)
+        return [loads(row[0]) for row in rows]
+
+    def _row(self, doc: Dict[str, Any]) -> Tuple:
+        return (dumps(doc).decode(),) + tuple(_to_sql(doc.get(c)) for c in self._columns)
+
+    async def insert_one(self, doc: Dict[str, Any]):
+        await asyncio.to_thread(self._pool.run, self._insert_sql, self._row(doc))
+        return None
+
+    async def update_one(self, filter: Dict[str, Any], update: Dict[str, Dict[str, Any]], upsert: bool = False):
+        """Apply $set/$inc/$min/$max to the newest match; with upsert, insert one built from filter instead"""
+        filter = filter or {}
+        sql = self._sql("update", self._shape(filter))
+        params = self._params(filter)
+
+        def work(conn):
+            row = conn.execute(sql, params).fetchone()
+            if row is not None:
+                conn.execute(self._update_sql, self._row(_apply_update(loads(row[1]), update)) + (row[0],))
+            elif upsert:
+                doc = {key: value for key, value in filter.items() if not is_operator(value)}
+                conn.execute(self._insert_sql, self._row(_apply_update(doc, update)))
+
+        await asyncio.to_thread(self._pool.transaction, work)
+        return None
+
+    async def find_one(self, filter: Dict[str, Any]):
+        filter = filter or {}
+        sql = self._sql("find_one", self._shape(filter))
+        rows = await asyncio.to_thread(self._pool.run, sql, self._params(filter), True)
+        return loads(rows[0][0]) if rows else None
+
+    async def count_by(self, field: str, values: Iterable) -> Dict[Any, int]:
+        """Number of documents per value of field, for each of values, in one grouped query"""
+        values = list(dict.fromkeys(values))
+        if not values:
+            return {}
+        filter = {field: {"$in": values}}
+        sql = self._sql("count_by", self._shape(filter))
+        counts = dict(await asyncio.to_thread(self._pool.run, sql, self._params(filter), True))
+        encode = _to_sql if field in self._columns else _to_json_value
+        return {value: counts.get(encode(value), 0) for value in values}
+
+    def find(self, filter: Optional[Dict[str, Any]] = None):
+        return SQLiteCursor(self, filter)
+
+    async def delete_many(self, filter: Dict[str, Any]):
+        filter = filter or {}
+        sql = self._sql("delete", self._shape(filter))
+        await asyncio.to_thread(self._pool.run, sql, self._params(filter))
+        return None
+
+
+class SQLiteCounters:
+    """Named counters shared by every process using the database file"""
+
+    INCR_SQL = (
+        "INSERT INTO counters (key, value) VALUES (?, 1) "
+        "ON CONFLICT(key) DO UPDATE SET value = value + 1 RETURNING value"
+    )
+    GET_SQL = "SELECT value FROM counters WHERE key = ?"
+    # Counters are durable, so values never repeat across restarts
+    epoch = ""
+
+    def __init__(self, pool: _ConnectionPool):
+        self._pool = pool
+
+    async def incr(self, key: str) -> int:
+        rows = await asyncio.to_thread(self._pool.run, self.INCR_SQL, (key,), True)
+        return rows[0][0]
+
+    async def get(self, key: str) -> int:
+        rows = await asyncio.to_thread(self._pool.run, self.GET_SQL, (key,), True)
+        return rows[0][0] if rows else 0
+
+
+class SQLiteDB:
+    def __init__(self, path: str, pool_size: int = 4):
+        self.path = path
+        self._create_schema()
+        self._pool = _ConnectionPool(path, pool_size)
+        for name in TABLES:
+            setattr(self, name, SQLiteCollection(name, self._pool))
+        self.counters = SQLiteCounters(self._pool)
+
+    def _create_schema(self):
+        conn = _connect(self.path)
+        try:
+            for name, spec in TABLES.items():
+                columns = "".join(f", {c}" for c in spec["columns"])
+                conn.execute(f"CREATE TABLE IF NOT EXISTS {name} (seq INTEGER PRIMARY KEY AUTOINCREMENT, doc TEXT NOT NULL{columns})")
+                existing = {row[1] for row in conn.execute(f"PRAGMA table_info({name})")}
+                for column in spec["columns"]:
+                    if column not in existing:
+                        # Column added in a later version: project it from the stored
+                        # documents (only valid for plain JSON values, not datetimes)
+                        conn.execute(f"ALTER TABLE {name} ADD COLUMN {column}")
+                        conn.execute(f"UPDATE {name} SET {column} = json_extract(doc, '$.{column}')")
+                for index in spec["indexes"]:
+                    conn.execute(f"CREATE INDEX IF NOT EXISTS ix_{name}_{'_'.join(index)} ON {name} ({', '.join(index)})")
+            conn.execute("CREATE TABLE IF NOT EXISTS counters (key TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+        finally:
+            conn.close()
+
+    def close(self):
+        self._pool.close()
@@ -0,0 +1,172 @@
+"""
+Serving the built frontend (frontend/build) from the API process.
+
+At startup every file under the build directory is read into an in-memory
+index along with gzip and, when the optional brotli module is installed,
+brotli variants, so requests never touch the filesystem. A `.gz`/`.br` file
+shipped next to an asset is used as-is instead of being generated.
+
+Vite's content-hashed files under assets/ are served as immutable; everything
+else (index.html in particular) is revalidated through its ETag. Paths that
+do not name a file and have no extension fall back to index.html so client
+side routes survive a reload.
+"""
+import gzip
+import logging
+import mimetypes
+from pathlib import Path
+from typing import Dict, Optional
+
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse, Response
+
+from http_cache import BROTLI_SUFFIX, GZIP_SUFFIX, etag_matches, not_modified, payload_etag
+
+try:
+    import brotli
+except ImportError:  # optional: without it only gzip variants are served
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+COMPRESSIBLE = ("text/", "application/javascript", "application/json", "application/xml", "application/wasm", "image/svg+xml")
+# Preferred first: (Content-Encoding, ETag suffix, file extension)
+ENCODINGS = (("br", BROTLI_SUFFIX, ".br"), ("gzip", GZIP_SUFFIX, ".gz"))
+
+
+class _StaticFile:
+    __slots__ = ("body", "media_type", "etag", "cache_control", "variants")
+
+    def __init__(self, body: bytes, media_type: str, cache_control: str):
+        self.body = body
+        self.media_type = media_type
+        self.etag = payload_etag(body)
+        self.cache_control = cache_control
+        self.variants: Dict[str, bytes] = {}
+
+
+def _accepted_encodings(header: str) -> set:
+    """Content codings the client accepts (q=0 means refused)"""
+    accepted = set()
+    for item in header.split(","):
+        coding, _, params = item.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+class StaticSite:
+    """ASGI app serving a prebuilt single-page app from memory"""
+
+    def __init__(
+        self,
+        directory,
+        immutable_prefix: str = "assets/",
+        fallback: str = "index.html",
+        compress_min_bytes: int = 1024,
+        excluded_prefix: str = "api/",
+    ):
+        self.directory = Path(directory)
+        self.immutable_prefix = immutable_prefix
+        self.fallback = fallback
+        self.compress_min_bytes = compress_min_bytes
+        self.excluded_prefix = excluded_prefix
+        self._files: Dict[str, _StaticFile] = {}
+
+    def load(self) -> int:
+        """Read the build directory into memory and precompress; returns the file count"""
+        if not (self.directory / self.fallback).is_file():
+            raise RuntimeError(f"No {self.fallback} in {self.directory}: build the frontend first")
+        files = {}
+        paths = sorted(p for p in self.directory.rglob("*") if p.is_file())
+        on_disk = {p.relative_to(self.directory).as_posix() for p in paths}
+        for path in paths:
+            name = path.relative_to(self.directory).as_posix()
+            if any(name.endswith(ext) and name[: -len(ext)] in on_disk for _, _, ext in ENCODINGS):
+                continue  # a precompressed variant, attached to its original below
+            media_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+            cache_control = IMMUTABLE if name.startswith(self.immutable_prefix) else REVALIDATE
+            entry = _StaticFile(path.read_bytes(), media_type, cache_control)
+            for encoding, _, ext in ENCODINGS:
+                if name + ext in on_disk:
+                    entry.variants[encoding] = (self.directory / (name + ext)).read_bytes()
+                else:
+                    compressed = self._compress(encoding, entry)
+                    if compressed is not None:
+                        entry.variants[encoding] = compressed
+            files[name] = entry
+        self._files = files
+        logger.info(
+            "Loaded frontend build",
+            extra={"directory": str(self.directory), "files": len(files), "brotli": brotli is not None},
+        )
+        return len(files)
+
+    def _compress(self, encoding: str, entry: _StaticFile) -> Optional[bytes]:
+        if len(entry.body) < self.compress_min_bytes or not entry.media_type.startswith(COMPRESSIBLE):
+            return None
+        if encoding == "gzip":
+            compressed = gzip.compress(entry.body, compresslevel=9, mtime=0)
+        elif brotli is not None:
+            compressed = brotli.compress(entry.body, quality=11)
+        else:
+            return None
+        # Only keep variants that actually save bytes
+        return compressed if len(compressed) < len(entry.body) else None
+
+    def _lookup(self, path: str) -> Optional[_StaticFile]:
+        name = path.lstrip("/")
+        entry = self._files.get(name or self.fallback)
+        if entry is None and name.endswith("/"):
+            entry = self._files.get(name + "index.html")
+        if entry is not None:
+            return entry
+        if "." in name.rsplit("/", 1)[-1]:
+            # Looks like a file (a missing asset): a 404 beats serving HTML as JS
+            return None
+        return self._files.get(self.fallback)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return
+        path = scope["path"]
+        root_path = scope.get("root_path", "")
+        if root_path and path.startswith(root_path):
+            path = path[len(root_path):]
+
+        if path.lstrip("/").startswith(self.excluded_prefix):
+            response: Response = JSONResponse({"detail": "Not Found"}, status_code=404)
+        elif scope["method"] not in ("GET", "HEAD"):
+            response = PlainTextResponse("Method Not Allowed", status_code=405, headers={"Allow": "GET, HEAD"})
+        else:
+            response = self._respond(Request(scope), path)
+        await response(scope, receive, send)
+
+    def _respond(self, request: Request, path: str) -> Response:
+        entry = self._lookup(path)
+        if entry is None:
+            return PlainTextResponse("Not Found", status_code=404)
+
+        accepted = _accepted_encodings(request.headers.get("accept-encoding", ""))
+        body, etag = entry.body, entry.etag
+        headers = {"Cache-Control": entry.cache_control, "Vary": "Accept-Encoding"}
+        for encoding, suffix, _ in ENCODINGS:
+            if encoding in entry.variants and encoding in accepted:
+                body = entry.variants[encoding]
+                # A strong validator must differ between encodings
+                etag = etag[:-1] + suffix + '"'
+                headers["Content-Encoding"] = encoding
+                break
+
+        if etag_matches(request, entry.etag):
+            response = not_modified(etag)
+            response.headers["Cache-Control"] = entry.cache_control
+            return response
+        headers["ETag"] = etag
+        if request.method == "HEAD":
+            headers["Content-Length"] = str(len(body))
+            return Response(status_code=200, media_type=entry.media_type, headers=headers)
+        return Response(content=body, media_type=entry.media_type, headers=headers)
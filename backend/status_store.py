@@ -0,0 +1,152 @@
+"""
+Bounded storage for status checks (uptime pings).
+
+Each client_name keeps its most recent checks in a fixed-size ring buffer
+(collections.deque with maxlen), and per-minute and per-hour rollups are
+updated incrementally on every insert, so reads never scan the full history.
+Rollup buckets are capped per client; the oldest bucket is dropped first.
+Clients beyond max_clients are evicted least recently written first.
+
+server.py keeps the stored copy of the checks (and, on durable backends,
+stored rollups) bounded the same way; StatusStore itself never does I/O.
+"""
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta
+from typing import Any, Deque, Dict, Iterable, List, Optional
+
+GRANULARITIES = ("raw", "minute", "hour")
+BUCKET_WIDTHS = {"minute": timedelta(minutes=1), "hour": timedelta(hours=1)}
+
+
+def bucket_start(timestamp: datetime, granularity: str) -> datetime:
+    if granularity == "minute":
+        return timestamp.replace(second=0, microsecond=0)
+    return timestamp.replace(minute=0, second=0, microsecond=0)
+
+
+class _ClientStatus:
+    __slots__ = ("checks", "minute", "hour", "written")
+
+    def __init__(self, ring_size: int):
+        self.checks: Deque[Dict[str, Any]] = deque(maxlen=ring_size)
+        # Checks recorded since the client was (re)created
+        self.written = 0
+        # bucket start -> [count, first_seen, last_seen]
+        self.minute: "OrderedDict[datetime, list]" = OrderedDict()
+        self.hour: "OrderedDict[datetime, list]" = OrderedDict()
+
+
+class StatusStore:
+    def __init__(
+        self,
+        ring_size: int = 1000,
+        minute_buckets: int = 1440,
+        hour_buckets: int = 720,
+        max_clients: int = 10000,
+    ):
+        self.ring_size = ring_size
+        self.limits = {"minute": minute_buckets, "hour": hour_buckets}
+        self.max_clients = max_clients
+        self._clients: "OrderedDict[str, _ClientStatus]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return sum(len(c.checks) for c in self._clients.values())
+
+    def _client(self, name: str) -> _ClientStatus:
+        client = self._clients.get(name)
+        if client is None:
+            client = self._clients[name] = _ClientStatus(self.ring_size)
+            if len(self._clients) > self.max_clients:
+                self._clients.popitem(last=False)
+        else:
+            self._clients.move_to_end(name)
+        return client
+
+    def record(self, check: Dict[str, Any], rollups: bool = True) -> int:
+        """Add a check; returns how many checks its client has recorded so far"""
+        client = self._client(check["client_name"])
+        client.checks.append(check)
+        client.written += 1
+        if not rollups:
+            return client.written
+
+        timestamp = check["timestamp"]
+        for granularity, limit in self.limits.items():
+            buckets = getattr(client, granularity)
+            start = bucket_start(timestamp, granularity)
+            bucket = buckets.get(start)
+            if bucket is None:
+                buckets[start] = [1, timestamp, timestamp]
+                if len(buckets) > limit:
+                    del buckets[min(buckets)]
+            else:
+                bucket[0] += 1
+                bucket[1] = min(bucket[1], timestamp)
+                bucket[2] = max(bucket[2], timestamp)
+        return client.written
+
+    def load(self, checks: Iterable[Dict[str, Any]], rollups: Optional[Iterable[Dict[str, Any]]] = None):
+        """Bulk-record checks in timestamp order (startup warm-up)
+
+        With rollups (stored bucket rows, as returned by rollup()), buckets
+        are restored from those instead of being rebuilt from the checks,
+        which only cover each client's ring.
+        """
+        for check in sorted(checks, key=lambda c: c["timestamp"]):
+            self.record(check, rollups=rollups is None)
+        for row in sorted(rollups or (), key=lambda r: r["bucket"]):
+            buckets = getattr(self._client(row["client_name"]), row["granularity"])
+            buckets[row["bucket"]] = [row["count"], row["first_seen"], row["last_seen"]]
+            if len(buckets) > self.limits[row["granularity"]]:
+                del buckets[min(buckets)]
+
+    def _selected(self, client_name: Optional[str]) -> List[_ClientStatus]:
+        if client_name is None:
+            return list(self._clients.values())
+        client = self._clients.get(client_name)
+        return [client] if client is not None else []
+
+    def raw(
+        self,
+        client_name: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: int = 1000,
+    ) -> List[Dict[str, Any]]:
+        """The newest `limit` checks in [since, until), oldest first"""
+        checks = [
+            check
+            for client in self._selected(client_name)
+            for check in list(client.checks)
+            if (since is None or check["timestamp"] >= since) and (until is None or check["timestamp"] < until)
+        ]
+        checks.sort(key=lambda c: c["timestamp"])
+        return checks[-limit:] if limit else []
+
+    def rollup(
+        self,
+        granularity: str,
+        client_name: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: int = 1000,
+    ) -> List[Dict[str, Any]]:
+        """The newest `limit` buckets overlapping [since, until), oldest first"""
+        # A bucket overlaps the range when it starts before `until` and its
+        # start is not earlier than the bucket containing `since`
+        floor = bucket_start(since, granularity) if since is not None else None
+        rows = []
+        for name, client in self._clients.items():
+            if client_name is not None and name != client_name:
+                continue
+            for start, (count, first_seen, last_seen) in list(getattr(client, granularity).items()):
+                if (floor is None or start >= floor) and (until is None or start < until):
+                    rows.append({
+                        "client_name": name,
+                        "bucket": start,
+                        "count": count,
+                        "first_seen": first_seen,
+                        "last_seen": last_seen,
+                    })
+        rows.sort(key=lambda r: (r["bucket"], r["client_name"]))
+        return rows[-limit:] if limit else []
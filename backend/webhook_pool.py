@@ -0,0 +1,137 @@
+"""
+Client-side load balancing across several n8n webhook endpoints.
+
+Sessions are sticky: a session always maps to the same endpoint through
+weighted rendezvous hashing, which every worker computes identically, so a
+conversation stays with one n8n instance's memory. Requests without a
+session (or when stickiness is off, or the sticky endpoint is saturated) go
+to the endpoint with the best load score:
+
+    least_outstanding   (in-flight requests + 1) / weight
+    latency             EWMA latency * (in-flight requests + 1) / weight
+
+Endpoints are ejected passively after consecutive failures and come back on
+probation once the ejection period ends.
+"""
+import hashlib
+import logging
+import math
+import time
+from typing import Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class Endpoint:
+    __slots__ = ("url", "weight", "outstanding", "latency", "failures", "ejected_until")
+
+    def __init__(self, url: str, weight: float):
+        self.url = url
+        self.weight = weight
+        self.outstanding = 0
+        self.latency = 0.0  # EWMA in seconds; 0 until the first response
+        self.failures = 0
+        self.ejected_until = 0.0
+
+
+def parse_endpoints(spec: str) -> List[Tuple[str, float]]:
+    """Parse "url;weight=2,url" (the N8N_WEBHOOK_URLS format)"""
+    endpoints = []
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        url, _, options = item.partition(";")
+        weight = 1.0
+        if options.startswith("weight="):
+            weight = float(options[len("weight="):])
+        endpoints.append((url.strip(), weight))
+    return endpoints
+
+
+def _hash_unit(key: str) -> float:
+    """Map a string to a float in (0, 1), identically in every process"""
+    digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+    return (int.from_bytes(digest, "big") + 1) / (2**64 + 2)
+
+
+class WebhookPool:
+    def __init__(
+        self,
+        strategy: str = "least_outstanding",
+        sticky: bool = True,
+        max_outstanding: int = 0,
+        eject_after: int = 3,
+        eject_seconds: float = 30.0,
+        latency_decay: float = 0.3,
+    ):
+        if strategy not in ("least_outstanding", "latency"):
+            raise ValueError(f"Unknown webhook balancing strategy: {strategy}")
+        self.strategy = strategy
+        self.sticky = sticky
+        self.max_outstanding = max_outstanding
+        self.eject_after = eject_after
+        self.eject_seconds = eject_seconds
+        self.latency_decay = latency_decay
+        self._endpoints: List[Endpoint] = []
+        self._spec: Tuple[Tuple[str, float], ...] = ()
+
+    @property
+    def endpoints(self) -> List[Endpoint]:
+        return list(self._endpoints)
+
+    def configure(self, endpoints: Iterable[Tuple[str, float]]):
+        """Replace the endpoint set, keeping stats of endpoints that remain"""
+        spec = tuple((url, float(weight)) for url, weight in endpoints)
+        if spec == self._spec:
+            return
+        existing = {e.url: e for e in self._endpoints}
+        fresh = []
+        for url, weight in spec:
+            endpoint = existing.get(url) or Endpoint(url, weight)
+            endpoint.weight = weight
+            fresh.append(endpoint)
+        self._endpoints = fresh
+        self._spec = spec
+
+    def _available(self) -> List[Endpoint]:
+        now = time.monotonic()
+        healthy = [e for e in self._endpoints if e.weight > 0 and e.ejected_until <= now]
+        # Fail open: if everything is ejected, try them all rather than nothing
+        return healthy or [e for e in self._endpoints if e.weight > 0]
+
+    def _score(self, endpoint: Endpoint) -> float:
+        load = (endpoint.outstanding + 1) / endpoint.weight
+        if self.strategy == "latency":
+            return load * (endpoint.latency or 1e-3)
+        return load
+
+    def pick(self, session_id: Optional[str] = None) -> Optional[Endpoint]:
+        candidates = self._available()
+        if not candidates:
+            return None
+        if self.sticky and session_id:
+            # Weighted rendezvous hashing: highest -weight / ln(u) wins
+            sticky = max(candidates, key=lambda e: -e.weight / math.log(_hash_unit(f"{session_id}|{e.url}")))
+            if not self.max_outstanding or sticky.outstanding < self.max_outstanding:
+                return sticky
+        return min(candidates, key=self._score)
+
+    def acquire(self, endpoint: Endpoint) -> float:
+        endpoint.outstanding += 1
+        return time.monotonic()
+
+    def release(self, endpoint: Endpoint, started: float, ok: bool):
+        endpoint.outstanding -= 1
+        elapsed = time.monotonic() - started
+        if endpoint.latency:
+            endpoint.latency += self.latency_decay * (elapsed - endpoint.latency)
+        else:
+            endpoint.latency = elapsed
+        if ok:
+            endpoint.failures = 0
+            return
+        endpoint.failures += 1
+        if endpoint.failures >= self.eject_after:
+            endpoint.ejected_until = time.monotonic() + self.eject_seconds
+            logger.warning(
+                "Ejecting webhook endpoint",
+                extra={"url": endpoint.url, "failures": endpoint.failures, "seconds": self.eject_seconds},
+            )
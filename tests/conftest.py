@@ -0,0 +1,35 @@
+import json
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+# The backend modules import their siblings by name
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend")
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+
+@pytest.fixture
+def run_app():
+    """run_app(env, body): run body in a new process with `client`, a TestClient of a
+    freshly imported server (it reads its settings at import), and return the JSON
+    printed on its last line"""
+
+    def run(env, body):
+        script = "import json, server\nfrom fastapi.testclient import TestClient\n"
+        script += "with TestClient(server.app) as client:\n" + textwrap.indent(textwrap.dedent(body), "    ")
+        result = subprocess.run(
+            [sys.executable, "-c", script],
+            cwd=BACKEND_DIR,
+            env={**os.environ, "LOG_LEVEL": "ERROR", "N8N_WEBHOOK_URL": "", "DB_BACKEND": "memory", **env},
+            capture_output=True,
+            text=True,
+            timeout=60,
+        )
+        assert result.returncode == 0, result.stderr
+        return json.loads(result.stdout.strip().splitlines()[-1])
+
+    return run
@@ -0,0 +1,59 @@
+import pytest
+
+LEGACY_IDS = [f"ffffffff-0000-4000-8000-00000000000{i}" for i in range(3)]
+
+
+def test_admin_routes_are_hidden_without_a_key(run_app):
+    status = run_app({"ADMIN_API_KEY": ""}, """
+        print(json.dumps(client.get("/api/admin/sessions").status_code))
+    """)
+    assert status == 404
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+def test_sessions_are_listed_by_creation_time(tmp_path, backend, run_app):
+    env = {"DB_BACKEND": backend, "SQLITE_PATH": str(tmp_path / "chat.db"), "ADMIN_API_KEY": "k"}
+    result = run_app(env, f"""
+        from datetime import datetime
+        headers = {{"X-Admin-Key": "k"}}
+        out = {{"wrong_key": client.get("/api/admin/sessions", headers={{"X-Admin-Key": "x"}}).status_code}}
+
+        async def seed():
+            # Older sessions with random ids (sorting above UUIDv7 ones) and no version counter
+            for session_id in {LEGACY_IDS!r}:
+                await server.db.chat_sessions.insert_one({{
+                    "id": session_id, "user_name": "Old", "user_email": "old@example.com",
+                    "created_at": datetime(2020, 1, 1),
+                }})
+            for _ in range(2):
+                message = server.ChatMessage(session_id="{LEGACY_IDS[0]}", message="old", sender="user")
+                await server.db.chat_messages.insert_one(message.model_dump())
+        client.portal.call(seed)
+        out["new"] = [
+            client.post("/api/chat/session", json={{"user_name": "N", "user_email": f"New{{i}}@Example.com"}}).json()["id"]
+            for i in range(3)
+        ]
+
+        out["pages"], cursor = [], None
+        while True:
+            params = {{"limit": 2, **({{"cursor": cursor}} if cursor else {{}})}}
+            page = client.get("/api/admin/sessions", params=params, headers=headers).json()
+            out["pages"].append([(s["id"], s["message_count"]) for s in page["sessions"]])
+            cursor = page["next_cursor"]
+            if not cursor:
+                break
+        for key, params in [("email", {{"email": "New1@EXAMPLE.com"}}), ("prefix", {{"email_prefix": "New2@EXAM"}})]:
+            page = client.get("/api/admin/sessions", params=params, headers=headers).json()
+            out[key] = [s["id"] for s in page["sessions"]]
+        print(json.dumps(out))
+    """)
+    assert result["wrong_key"] == 401
+    new = result["new"]
+    # Three sessions share one created_at, so a page boundary falls inside the tie
+    assert [len(page) for page in result["pages"]] == [2, 2, 2]
+    listed = [tuple(entry) for page in result["pages"] for entry in page]
+    assert listed == [(i, 0) for i in reversed(new)] + [
+        (LEGACY_IDS[2], 0), (LEGACY_IDS[1], 0), (LEGACY_IDS[0], 2),
+    ]
+    assert result["email"] == [new[1]]
+    assert result["prefix"] == [new[2]]
@@ -0,0 +1,26 @@
+import asyncio
+
+from chat_queue import ChatJobQueue
+
+
+def test_worker_survives_a_failing_timeout_handler():
+    handled = []
+
+    async def handler(job):
+        if job == "slow":
+            await asyncio.sleep(1)
+        handled.append(job)
+
+    async def on_timeout(job):
+        raise RuntimeError("could not store the error reply")
+
+    async def main():
+        queue = ChatJobQueue(handler, on_timeout, workers=1, deadline=0.01)
+        await queue.start()
+        queue.submit("slow")
+        queue.submit("fast")
+        await asyncio.wait_for(queue._queue.join(), 1)
+        await queue.stop()
+
+    asyncio.run(main())
+    assert handled == ["fast"]
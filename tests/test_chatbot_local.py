@@ -23,6 +23,11 @@ repo_root = "/workspace"
 if repo_root not in sys.path:
     sys.path.insert(0, repo_root)
 
+# server.py imports its sibling modules (in_memory_db, journal, ...) by name
+backend_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend")
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+
 from backend.server import app  # noqa: E402
 
 
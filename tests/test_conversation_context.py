@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from conversation_context import ELLIPSIS, build_context, estimate_tokens, truncate
+
+START = datetime(2025, 1, 1)
+
+
+class Message:
+    def __init__(self, i, text=None):
+        self.id = f"m{i}"
+        self.message = text if text is not None else f"message {i}"
+        self.sender = "user" if i % 2 == 0 else "bot"
+        self.timestamp = START + timedelta(seconds=i)
+
+
+MESSAGES = [Message(i) for i in range(6)]
+
+
+def _texts(window):
+    return [m["message"] for m in window]
+
+
+def test_window_stops_before_the_current_message():
+    window = build_context(MESSAGES, "m4", max_turns=2)
+    assert _texts(window) == ["message 2", "message 3"]
+    assert window[0] == {"sender": "user", "message": "message 2", "timestamp": MESSAGES[2].timestamp.isoformat()}
+
+
+def test_all_messages_count_when_the_current_one_is_absent():
+    assert _texts(build_context(MESSAGES[:3], "m9", max_turns=5)) == ["message 0", "message 1", "message 2"]
+    assert build_context(MESSAGES, "m0", max_turns=5) == []
+    assert build_context(MESSAGES, "m3", max_turns=0) == []
+
+
+def test_token_budget_drops_the_oldest_messages():
+    per_message = estimate_tokens("message 0")
+    window = build_context(MESSAGES, "m5", max_turns=5, max_tokens=2 * per_message + 1)
+    assert _texts(window) == ["message 3", "message 4"]
+
+
+def test_newest_message_over_budget_is_cut_to_fit():
+    long = [Message(0, "x" * 400), Message(1)]
+    window = build_context(long, "m1", max_turns=3, max_tokens=20)
+    assert len(window) == 1
+    assert window[0]["message"].endswith(ELLIPSIS)
+    assert estimate_tokens(window[0]["message"]) <= 20
+
+
+def test_budget_too_small_for_any_text_sends_nothing():
+    assert build_context([Message(0, "x" * 400), Message(1)], "m1", max_turns=3, max_tokens=4) == []
+
+
+def test_max_chars_cuts_every_message():
+    window = build_context([Message(0, "abcdefghij"), Message(1, "short")], None, max_turns=2, max_chars=6)
+    assert _texts(window) == ["abcde" + ELLIPSIS, "short"]
+
+
+@pytest.mark.parametrize("text, max_chars, expected", [
+    ("hello", 0, "hello"),
+    ("hello", 5, "hello"),
+    ("hello world", 6, "hello" + ELLIPSIS),
+    ("hello", 1, ELLIPSIS),
+])
+def test_truncate(text, max_chars, expected):
+    assert truncate(text, max_chars) == expected
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 4
+    assert estimate_tokens("abcd") == 5
+    assert estimate_tokens("abcde") == 6
+
+
+@pytest.mark.parametrize("backend, session_id", [("memory", None), ("sqlite", "legacy-session")])
+def test_context_of_a_queued_message_leaves_out_later_ones(tmp_path, run_app, backend, session_id):
+    env = {"DB_BACKEND": backend, "SQLITE_PATH": str(tmp_path / "chat.db"), "N8N_CONTEXT_TURNS": "2"}
+    window = run_app(env, f"""
+        session_id = {session_id!r} or client.post("/api/chat/session", json={{"user_name": "A", "user_email": "a@example.com"}}).json()["id"]
+
+        async def scenario():
+            # The user sent more messages than the window holds before the job for "m1" ran
+            stored = [await server._store_message(session_id, f"m{{i}}", "user") for i in range(6)]
+            return await server._conversation_context(session_id, stored[1].id)
+        print(json.dumps([m["message"] for m in client.portal.call(scenario)]))
+    """)
+    assert window == ["m0"]
@@ -0,0 +1,73 @@
+from datetime import datetime
+
+from history_cache import HistoryCache
+
+
+class Message:
+    def __init__(self, id, text):
+        self.id = id
+        self.message = text
+        self.timestamp = datetime(2025, 1, 1)
+
+
+def test_append_to_unknown_session_is_not_cached():
+    cache = HistoryCache(max_messages=10)
+    # Version 1 could be the first message after rows written without a counter
+    cache.append("s", Message("m1", "hi"), 1)
+    assert cache.get("s", 1) is None
+
+
+def test_append_to_started_session_is_complete():
+    cache = HistoryCache(max_messages=10)
+    cache.start("s")
+    cache.append("s", Message("m1", "hi"), 1)
+    assert [m.id for m in cache.get("s", 1)] == ["m1"]
+
+
+def test_history_keeps_rows_stored_before_the_counter(tmp_path, run_app):
+    env = {"DB_BACKEND": "sqlite", "SQLITE_PATH": str(tmp_path / "chat.db")}
+    # Seed a legacy session straight into the store: rows, but no version counter
+    run_app(env, """
+        import asyncio
+        async def seed():
+            await server.db.chat_sessions.insert_one({"id": "legacy", "user_name": "A", "user_email": "a@example.com"})
+            for i in range(4):
+                await server.db.chat_messages.insert_one(server.ChatMessage(session_id="legacy", message=f"old {i}", sender="user").model_dump())
+        client.portal.call(seed)
+        print(json.dumps(None))
+    """)
+    messages = run_app(env, """
+        client.post("/api/chat/message", json={"session_id": "legacy", "message": "new"})
+        print(json.dumps([m["message"] for m in client.get("/api/chat/messages/legacy").json()]))
+    """)
+    assert messages[:5] == ["old 0", "old 1", "old 2", "old 3", "new"]
+    assert len(messages) == 6
+
+
+def test_history_survives_journal_restart(tmp_path, run_app):
+    env = {"DB_BACKEND": "memory", "IN_MEMORY_JOURNAL_DIR": str(tmp_path / "journal")}
+    session_id = run_app(env, """
+        session = client.post("/api/chat/session", json={"user_name": "A", "user_email": "a@example.com"}).json()
+        for i in range(2):
+            client.post("/api/chat/message", json={"session_id": session["id"], "message": f"before {i}"})
+        print(json.dumps(session["id"]))
+    """)
+    messages = run_app(env, f"""
+        client.post("/api/chat/message", json={{"session_id": "{session_id}", "message": "after"}})
+        print(json.dumps([m["message"] for m in client.get("/api/chat/messages/{session_id}").json()]))
+    """)
+    assert [m for m in messages if not m.startswith("The chatbot")] == ["before 0", "before 1", "after"]
+    assert len(messages) == 6
+
+
+def test_capped_full_read_does_not_fill_the_cache(run_app):
+    newest = run_app({}, """
+        async def seed():
+            for i in range(1100):
+                await server.db.chat_messages.insert_one(server.ChatMessage(session_id="long", message=f"m{i}", sender="user").model_dump())
+        client.portal.call(seed)
+        # Without a limit the history stops at the oldest 1000 messages
+        assert len(client.get("/api/chat/messages/long").json()) == 1000
+        print(json.dumps([m["message"] for m in client.get("/api/chat/messages/long", params={"limit": 3}).json()]))
+    """)
+    assert newest == ["m1097", "m1098", "m1099"]
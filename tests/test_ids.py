@@ -0,0 +1,63 @@
+import threading
+import uuid
+
+import ids
+from ids import is_uuid7, new_id, uuid7
+
+MS = 1_700_000_000_000
+
+
+def _frozen_clock(monkeypatch, ms):
+    monkeypatch.setattr(ids.time, "time_ns", lambda: ms * 1_000_000)
+    monkeypatch.setattr(ids, "_last_ms", 0)
+
+
+def test_layout():
+    value = uuid7()
+    assert value.version == 7
+    assert value.variant == uuid.RFC_4122
+    assert abs((value.int >> 80) - ids.time.time_ns() // 1_000_000) < 1000
+
+
+def test_ids_are_strictly_increasing_within_a_millisecond(monkeypatch):
+    _frozen_clock(monkeypatch, MS)
+    values = [new_id() for _ in range(500)]
+    assert values == sorted(values) and len(set(values)) == len(values)
+    assert {uuid.UUID(v).int >> 80 for v in values} == {MS}
+
+
+def test_counter_overflow_borrows_the_next_millisecond(monkeypatch):
+    _frozen_clock(monkeypatch, MS)
+    values = [uuid7() for _ in range(ids._MAX_COUNTER + 2)]
+    assert values == sorted(values, key=lambda u: u.bytes)
+    assert len(set(values)) == len(values)
+    assert values[-1].int >> 80 == MS + 1
+
+
+def test_clock_stepping_back_keeps_ids_increasing(monkeypatch):
+    _frozen_clock(monkeypatch, MS)
+    before = new_id()
+    monkeypatch.setattr(ids.time, "time_ns", lambda: (MS - 5000) * 1_000_000)
+    assert new_id() > before
+
+
+def test_ids_from_many_threads_are_unique_and_ordered_per_thread():
+    results = [[] for _ in range(8)]
+
+    def work(out):
+        out.extend(new_id() for _ in range(2000))
+
+    threads = [threading.Thread(target=work, args=(out,)) for out in results]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert all(out == sorted(out) for out in results)
+    assert len({v for out in results for v in out}) == 8 * 2000
+
+
+def test_is_uuid7():
+    assert is_uuid7(new_id())
+    assert not is_uuid7(str(uuid.uuid4()))
+    assert not is_uuid7(None)
+    assert not is_uuid7("not-an-id")
@@ -0,0 +1,89 @@
+import json
+import os
+
+import pytest
+
+from intents import Intent, IntentMatcher, compile_intents
+
+TABLE = {"intents": [
+    {"name": "price", "patterns": ["price", "how much", "cost"], "response": "From $15 per person."},
+    {"name": "menu", "patterns": ["menu", "vegetarian option"], "response": "Brisket, ribs and more."},
+]}
+
+
+def _write(path, table, mtime=None):
+    path.write_text(json.dumps(table))
+    if mtime is not None:
+        # Same-second rewrites may not move the mtime on every filesystem
+        os.utime(path, ns=(mtime, mtime))
+
+
+@pytest.fixture
+def matcher(tmp_path):
+    path = tmp_path / "intents.json"
+    _write(path, TABLE, 1_000_000_000)
+    return IntentMatcher(str(path), reload_interval=0, max_message_length=60)
+
+
+def _name(intent):
+    return intent.name if intent is not None else None
+
+
+@pytest.mark.parametrize("message, expected", [
+    ("What's the price?", "price"),
+    ("PRICES please", "price"),
+    ("How   much for 50 people", "price"),
+    ("do you have vegetarian options", "menu"),
+    ("I love your costumes", None),
+    ("hello there", None),
+])
+def test_match(matcher, message, expected):
+    assert _name(matcher.match(message)) == expected
+
+
+def test_ambiguous_and_long_messages_pass_to_n8n(matcher):
+    assert matcher.match("How much is the menu?") is None
+    assert matcher.match("price " + "x" * 60) is None
+    stats = matcher.stats()
+    assert (stats["matched"], stats["passed"], stats["ambiguous"]) == (0, 2, 1)
+
+
+def test_stats(matcher):
+    matcher.match("price?")
+    matcher.match("menu?")
+    matcher.match("menu!")
+    matcher.match("hi")
+    stats = matcher.stats()
+    assert stats["by_intent"] == {"price": 1, "menu": 2}
+    assert stats["match_rate"] == 0.75
+    assert stats["intents"] == 2
+
+
+def test_hot_reload_and_broken_file(matcher, tmp_path):
+    path = tmp_path / "intents.json"
+    table = {"intents": TABLE["intents"] + [{"name": "hours", "patterns": ["open"], "response": "9 to 5."}]}
+    _write(path, table, 2_000_000_000)
+    assert _name(matcher.match("when are you open")) == "hours"
+
+    path.write_text("{not json")
+    os.utime(path, ns=(3_000_000_000, 3_000_000_000))
+    # A broken file keeps the previous table
+    assert _name(matcher.match("when are you open")) == "hours"
+
+
+def test_reload_waits_for_the_interval(tmp_path):
+    path = tmp_path / "intents.json"
+    _write(path, TABLE, 1_000_000_000)
+    matcher = IntentMatcher(str(path), reload_interval=3600)
+    assert _name(matcher.match("price")) == "price"
+    _write(path, {"intents": []}, 2_000_000_000)
+    assert _name(matcher.match("price")) == "price"
+    matcher.reload()
+    assert matcher.match("price") is None
+
+
+def test_compile_intents_skips_empty_patterns():
+    assert compile_intents([]) is None
+    assert compile_intents([Intent("blank", [" ", ""], "x")]) is None
+    pattern = compile_intents([Intent("blank", [""], "x"), Intent("menu", ["Menu"], "y")])
+    assert [m.lastgroup for m in pattern.finditer("the menu")] == ["i1"]
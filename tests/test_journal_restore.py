@@ -0,0 +1,94 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from in_memory_db import InMemoryDB
+from journal import Journal
+
+START = datetime(2025, 1, 1)
+
+
+def _restart(directory):
+    """A fresh database restored from the journal in directory"""
+    db = InMemoryDB()
+    journal = Journal(str(directory), fsync=False)
+    journal.attach(db)
+    journal.load()
+    return db, journal
+
+
+async def _history(db, session_id):
+    return await db.chat_messages.find({"session_id": session_id}).sort("timestamp", 1).to_list(1000)
+
+
+def test_journal_restores_inserts_and_deletes(tmp_path):
+    async def write():
+        db, journal = _restart(tmp_path)
+        await journal.start()
+        await db.chat_sessions.insert_one({"id": "s1", "user_name": "Ann", "user_email": "ann@example.com"})
+        for i in range(5):
+            await db.chat_messages.insert_one({
+                "id": f"m{i}", "session_id": "s1", "message": f"hi {i}", "sender": "user",
+                "timestamp": START + timedelta(seconds=i),
+            })
+        await db.chat_messages.insert_one({
+            "id": "x", "session_id": "gone", "message": "bye", "sender": "user", "timestamp": START,
+        })
+        await db.chat_messages.delete_many({"session_id": "gone"})
+        await journal.stop()
+
+    async def read():
+        db, _ = _restart(tmp_path)
+        assert await db.chat_sessions.find_one({"id": "s1"}) == {
+            "id": "s1", "user_name": "Ann", "user_email": "ann@example.com",
+        }
+        history = await _history(db, "s1")
+        assert [m["message"] for m in history] == [f"hi {i}" for i in range(5)]
+        assert history[0]["timestamp"] == START
+        assert await _history(db, "gone") == []
+
+    asyncio.run(write())
+    asyncio.run(read())
+
+
+def test_journal_restores_from_snapshot_and_log_tail(tmp_path):
+    async def write():
+        db, journal = _restart(tmp_path)
+        await journal.start()
+        for i in range(3):
+            await db.chat_messages.insert_one({
+                "id": f"a{i}", "session_id": "s", "message": str(i), "sender": "bot",
+                "timestamp": START + timedelta(seconds=i),
+            })
+        await journal.snapshot()
+        await db.chat_messages.insert_one({
+            "id": "a3", "session_id": "s", "message": "3", "sender": "bot",
+            "timestamp": START + timedelta(seconds=3),
+        })
+        await journal.stop()
+
+    async def read():
+        db, _ = _restart(tmp_path)
+        assert [m["message"] for m in await _history(db, "s")] == ["0", "1", "2", "3"]
+
+    asyncio.run(write())
+    asyncio.run(read())
+
+
+def test_journal_cuts_off_a_torn_record(tmp_path):
+    async def insert(*ids):
+        db, journal = _restart(tmp_path)
+        await journal.start()
+        for session_id in ids:
+            await db.chat_sessions.insert_one({"id": session_id, "user_name": "A", "user_email": "a@example.com"})
+        await journal.stop()
+
+    async def ids():
+        db, _ = _restart(tmp_path)
+        return [s["id"] for s in await db.chat_sessions.find({}).sort("id", 1).to_list(100)]
+
+    asyncio.run(insert("a"))
+    # A crash tore the first record of the next segment, which a restart reopens
+    with open(tmp_path / f"journal-{2:020d}.log", "ab") as f:
+        f.write(b'{"s":2,"c":"chat_ses')
+    asyncio.run(insert("b", "c"))
+    assert asyncio.run(ids()) == ["a", "b", "c"]
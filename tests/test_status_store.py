@@ -0,0 +1,125 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from status_store import StatusStore, bucket_start
+
+START = datetime(2025, 1, 1, 10, 0, 0)
+
+
+def _check(client, seconds):
+    return {"client_name": client, "timestamp": START + timedelta(seconds=seconds)}
+
+
+def test_bucket_start():
+    timestamp = datetime(2025, 1, 1, 10, 42, 17, 123)
+    assert bucket_start(timestamp, "minute") == datetime(2025, 1, 1, 10, 42)
+    assert bucket_start(timestamp, "hour") == datetime(2025, 1, 1, 10)
+
+
+def test_ring_keeps_the_newest_checks():
+    store = StatusStore(ring_size=3)
+    written = [store.record(_check("a", i)) for i in range(5)]
+    assert written == [1, 2, 3, 4, 5]
+    assert [c["timestamp"].second for c in store.raw("a")] == [2, 3, 4]
+    assert len(store) == 3
+
+
+def test_rollups_count_every_check_in_their_bucket():
+    store = StatusStore(ring_size=2)
+    for seconds in (5, 50, 65, 3700):
+        store.record(_check("a", seconds))
+    minutes = store.rollup("minute", "a")
+    assert [(r["bucket"], r["count"]) for r in minutes] == [
+        (START, 2), (START + timedelta(minutes=1), 1), (START + timedelta(hours=1, minutes=1), 1),
+    ]
+    assert minutes[0]["first_seen"] == START + timedelta(seconds=5)
+    assert minutes[0]["last_seen"] == START + timedelta(seconds=50)
+    # The ring only holds two checks, the rollups still cover all four
+    assert [(r["bucket"], r["count"]) for r in store.rollup("hour", "a")] == [
+        (START, 3), (START + timedelta(hours=1), 1),
+    ]
+
+
+def test_rollup_range_includes_the_bucket_holding_since():
+    store = StatusStore()
+    for minute in range(5):
+        store.record(_check("a", minute * 60))
+    rows = store.rollup("minute", since=START + timedelta(minutes=1, seconds=30), until=START + timedelta(minutes=3))
+    assert [r["bucket"].minute for r in rows] == [1, 2]
+
+
+def test_bucket_and_client_caps_drop_the_oldest():
+    store = StatusStore(minute_buckets=2, max_clients=2)
+    for minute in range(3):
+        store.record(_check("a", minute * 60))
+    assert [r["bucket"].minute for r in store.rollup("minute", "a")] == [1, 2]
+    store.record(_check("b", 0))
+    store.record(_check("a", 200))
+    store.record(_check("c", 0))
+    # "b" was written least recently
+    assert store.raw("b") == []
+    assert {r["client_name"] for r in store.raw()} == {"a", "c"}
+
+
+@pytest.mark.parametrize("limit", [1, 2])
+def test_raw_and_rollup_limits_keep_the_newest(limit):
+    store = StatusStore()
+    for client in ("a", "b"):
+        store.record(_check(client, 0))
+    assert [r["client_name"] for r in store.raw(limit=limit)] == ["a", "b"][-limit:]
+    assert [r["client_name"] for r in store.rollup("minute", limit=limit)] == ["a", "b"][-limit:]
+
+
+def test_load_restores_stored_rollups_instead_of_rebuilding():
+    store = StatusStore(ring_size=1)
+    rollups = [
+        {"client_name": "a", "granularity": "minute", "bucket": START, "count": 7,
+         "first_seen": START, "last_seen": START + timedelta(seconds=59)},
+    ]
+    store.load([_check("a", 59)], rollups)
+    assert [r["count"] for r in store.rollup("minute", "a")] == [7]
+    assert store.rollup("hour", "a") == []
+    assert len(store.raw("a")) == 1
+
+
+def test_stored_checks_are_trimmed_and_survive_a_journal_restart(tmp_path, run_app):
+    env = {"STATUS_RING_SIZE": "5", "IN_MEMORY_JOURNAL_DIR": str(tmp_path / "journal")}
+    stored = run_app(env, """
+        for i in range(12):
+            client.post("/api/status", json={"client_name": "a"})
+        print(json.dumps(len(server.db.status_checks)))
+    """)
+    # Trimmed back to the ring every ring's worth of checks
+    assert stored == 7
+    result = run_app(env, """
+        print(json.dumps([len(client.get("/api/status").json()), len(server.db.status_checks)]))
+    """)
+    assert result == [5, 7]
+
+
+def test_multi_worker_reads_use_stored_rollups(tmp_path, run_app):
+    env = {"DB_BACKEND": "sqlite", "SQLITE_PATH": str(tmp_path / "status.db"), "STATUS_RING_SIZE": "5"}
+    run_app(env, """
+        for i in range(12):
+            client.post("/api/status", json={"client_name": "a" if i % 3 else "b"})
+        print(json.dumps(None))
+    """)
+    result = run_app({**env, "WEB_CONCURRENCY": "2"}, """
+        raw = client.get("/api/status", params={"client_name": "a"}).json()
+        hours = client.get("/api/status", params={"granularity": "hour"}).json()
+        counts = {}
+        for row in hours:
+            counts[row["client_name"]] = counts.get(row["client_name"], 0) + row["count"]
+        print(json.dumps([len(raw), counts]))
+    """)
+    assert result[0] == 8
+    assert result[1] == {"a": 8, "b": 4}
+    # A single worker restores the stored rollups, not just the rings' worth
+    hours = run_app(env, """
+        counts = {}
+        for row in client.get("/api/status", params={"granularity": "hour"}).json():
+            counts[row["client_name"]] = counts.get(row["client_name"], 0) + row["count"]
+        print(json.dumps(counts))
+    """)
+    assert hours == {"a": 8, "b": 4}
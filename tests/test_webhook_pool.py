@@ -0,0 +1,107 @@
+import pytest
+
+import webhook_pool
+from webhook_pool import WebhookPool, parse_endpoints
+
+URLS = [("http://a", 1.0), ("http://b", 1.0), ("http://c", 2.0)]
+SESSIONS = [f"session-{i}" for i in range(2000)]
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(webhook_pool.time, "monotonic", clock)
+    return clock
+
+
+def _pool(urls=URLS, **options):
+    pool = WebhookPool(**options)
+    pool.configure(urls)
+    return pool
+
+
+def _fail(pool, endpoint, times=1):
+    for _ in range(times):
+        pool.release(endpoint, pool.acquire(endpoint), ok=False)
+
+
+def test_parse_endpoints():
+    assert parse_endpoints(" http://a;weight=2, ,http://b ") == [("http://a", 2.0), ("http://b", 1.0)]
+
+
+def test_sessions_stick_to_one_endpoint_in_every_process():
+    first, second = _pool(), _pool()
+    assert [first.pick(s).url for s in SESSIONS] == [second.pick(s).url for s in SESSIONS]
+
+
+def test_sticky_share_follows_weight():
+    pool = _pool()
+    picks = [pool.pick(s).url for s in SESSIONS]
+    assert 0.45 < picks.count("http://c") / len(picks) < 0.55
+
+
+def test_removing_an_endpoint_only_moves_its_sessions():
+    before = {s: _pool().pick(s).url for s in SESSIONS}
+    after = {s: _pool(URLS[:2]).pick(s).url for s in SESSIONS}
+    assert all(after[s] == url for s, url in before.items() if url != "http://c")
+
+
+def test_saturated_sticky_endpoint_falls_back_to_least_outstanding():
+    pool = _pool(max_outstanding=1)
+    sticky = pool.pick("s")
+    pool.acquire(sticky)
+    assert pool.pick("s") is not sticky
+    assert pool.pick("s").outstanding == 0
+
+
+def test_least_outstanding_weighs_in_flight_requests():
+    pool = _pool(sticky=False)
+    c = pool.pick()
+    assert c.url == "http://c"
+    pool.acquire(c)
+    pool.acquire(c)
+    assert pool.pick().url != "http://c"
+
+
+def test_failing_endpoint_is_ejected_then_on_probation(clock):
+    pool = _pool(URLS[:2], sticky=False, eject_after=3, eject_seconds=30)
+    a, b = pool.endpoints
+    _fail(pool, a, 2)
+    assert a in pool._available()
+    _fail(pool, a)
+    assert all(pool.pick() is b for _ in range(5))
+
+    clock.now += 31
+    assert a in pool._available()
+    # Back on probation: one more failure ejects it again
+    _fail(pool, a)
+    assert a not in pool._available()
+
+    clock.now += 31
+    pool.release(a, pool.acquire(a), ok=True)
+    _fail(pool, a)
+    assert a in pool._available()
+
+
+def test_all_ejected_fails_open(clock):
+    pool = _pool(URLS[:1], eject_after=1)
+    (a,) = pool.endpoints
+    _fail(pool, a)
+    assert pool.pick("s") is a
+
+
+def test_configure_keeps_stats_of_remaining_endpoints():
+    pool = _pool()
+    a = pool.endpoints[0]
+    pool.acquire(a)
+    pool.configure([("http://a", 3.0), ("http://d", 1.0)])
+    assert pool.endpoints[0] is a and a.outstanding == 1 and a.weight == 3.0
+    assert [e.url for e in pool.endpoints] == ["http://a", "http://d"]